@@ -0,0 +1,17 @@
+"""
+Замеры производительности маршрутов posts, users и about.
+
+Сценарии описаны в модулях bench_*.py списками CASES. Каждый прогон
+создаёт отдельную тестовую базу SQLite, наполняет её командой seed в
+объёме набора данных и для каждого сценария измеряет время ответа,
+число SQL-запросов и время SQL. Результаты сравниваются с
+baselines.json: регрессией считается рост числа запросов.
+
+Времена зависят от машины, поэтому проверяются только с флагом
+--check-times, с допуском из --tolerance или переменной окружения
+BENCHMARK_TOLERANCE. Перед такой проверкой базовые значения нужно
+снять на той же машине командой с --update.
+
+Запуск: python manage.py benchmark [--datasets small medium]
+[--check-times] [--update]
+"""
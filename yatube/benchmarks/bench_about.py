@@ -0,0 +1,6 @@
+from .cases import Case, url
+
+CASES = [
+    Case('about:author', url('about:author')),
+    Case('about:tech', url('about:tech')),
+]
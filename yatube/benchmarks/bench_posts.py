@@ -0,0 +1,49 @@
+from .cases import Case, url
+
+
+def author(fixtures):
+    return fixtures.author.username
+
+
+def post_id(fixtures):
+    return fixtures.post.pk
+
+
+def group(fixtures):
+    return fixtures.group.slug
+
+
+def new_post(fixtures):
+    return {'title': 'Новый пост', 'text': 'Текст нового поста',
+            'group': fixtures.group.pk}
+
+
+CASES = [
+    Case('posts:index', url('posts:index')),
+    Case('posts:index', url('posts:index', query='?page=50'), 'page 50'),
+    Case('posts:follow_index', url('posts:follow_index'), user='follower'),
+    Case('posts:profile', url('posts:profile', author)),
+    Case('posts:profile_follow', url('posts:profile_follow', author),
+         user='reader', status=302),
+    Case('posts:profile_unfollow', url('posts:profile_unfollow', author),
+         user='follower', status=302),
+    Case('posts:authors', url('posts:authors')),
+    Case('posts:group_list', url('posts:group_list', group)),
+    Case('posts:group_detail', url('posts:group_detail')),
+    Case('posts:groups', url('posts:groups')),
+    Case('posts:post_detail', url('posts:post_detail', post_id)),
+    Case('posts:post_edit', url('posts:post_edit', post_id), user='author'),
+    Case('posts:post_edit', url('posts:post_edit', post_id), 'POST',
+         method='post', data=new_post, user='author', status=302),
+    Case('posts:post_delete', url('posts:post_delete', post_id),
+         user='author', status=302),
+    Case('posts:add_comment', url('posts:add_comment', post_id),
+         method='post', data=lambda fixtures: {'text': 'Комментарий'},
+         user='reader', status=302),
+    Case('posts:comments', url('posts:comments', post_id)),
+    Case('posts:search', url('posts:search'),
+         data=lambda fixtures: {'q': fixtures.search_query}),
+    Case('posts:post_create', url('posts:post_create'), user='author'),
+    Case('posts:post_create', url('posts:post_create'), 'POST',
+         method='post', data=new_post, user='author', status=302),
+]
@@ -0,0 +1,64 @@
+from django.contrib.auth.tokens import default_token_generator
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from posts.models import User
+from posts.settings import SEED_PASSWORD
+
+from .cases import Case, url
+
+
+def reset_uid(fixtures):
+    return urlsafe_base64_encode(force_bytes(fixtures.author.pk))
+
+
+def reset_token(fixtures):
+    # Токен зависит от last_login, который меняют входы других сценариев
+    return default_token_generator.make_token(
+        User.objects.get(pk=fixtures.author.pk))
+
+
+def login(fixtures):
+    return {'username': fixtures.author.username,
+            'password': SEED_PASSWORD}
+
+
+def password_change(fixtures):
+    return {'old_password': SEED_PASSWORD,
+            'new_password1': 'Benchmark-password-2',
+            'new_password2': 'Benchmark-password-2'}
+
+
+def signup(fixtures):
+    return {'username': 'benchmark', 'email': 'benchmark@example.com',
+            'password1': 'Benchmark-password-1',
+            'password2': 'Benchmark-password-1'}
+
+
+CASES = [
+    Case('users:signup', url('users:signup')),
+    Case('users:signup', url('users:signup'), 'POST', method='post',
+         data=signup, status=302),
+    Case('users:logout', url('users:logout'), user='author'),
+    Case('users:login', url('users:login')),
+    Case('users:login', url('users:login'), 'POST', method='post',
+         data=login, status=302),
+    Case('users:password_change_form', url('users:password_change_form'),
+         user='author'),
+    Case('users:password_change_form', url('users:password_change_form'),
+         'POST', method='post', data=password_change, user='author',
+         status=302),
+    Case('users:password_change_done', url('users:password_change_done'),
+         user='author'),
+    Case('users:password_reset_form', url('users:password_reset_form')),
+    Case('users:password_reset_form', url('users:password_reset_form'),
+         'POST', method='post',
+         data=lambda fixtures: {'email': fixtures.author.email},
+         status=302),
+    Case('users:password_reset_done', url('users:password_reset_done')),
+    Case('users:password_reset_confirm',
+         url('users:password_reset_confirm', reset_uid, reset_token),
+         status=302),
+    Case('users:password_reset_complete',
+         url('users:password_reset_complete')),
+]
@@ -0,0 +1,87 @@
+import importlib
+import pkgutil
+from typing import Callable, List, NamedTuple, Optional
+
+from django.db.models import Count
+from django.urls import reverse
+
+from posts.models import Follow, Group, Post, User
+
+
+class Fixtures(NamedTuple):
+    """Объекты набора данных, на которые ссылаются сценарии."""
+    author: User
+    follower: User
+    reader: User
+    post: Post
+    group: Group
+    search_query: str
+
+    @classmethod
+    def load(cls) -> 'Fixtures':
+        """
+        Выбирает самые нагруженные объекты: сценарии должны попадать на
+        горячие страницы, а не на пустые.
+        """
+        author = (User.objects.annotate(posts_total=Count('posts'))
+                  .order_by('-posts_total', 'pk').first())
+        author.email = 'author@example.com'
+        author.save(update_fields=('email',))
+        follow = (Follow.objects.filter(author=author).order_by('pk').first()
+                  or Follow.objects.create(
+                      author=author,
+                      user=User.objects.exclude(pk=author.pk).first()))
+        reader = (User.objects.exclude(pk=author.pk)
+                  .exclude(follower__author=author).order_by('pk').first())
+        post = author.posts.order_by('-comments_count', 'pk').first()
+        group = Group.objects.order_by('-posts_count', 'pk').first()
+        return cls(
+            author=author, follower=follow.user, reader=reader, post=post,
+            group=group, search_query=post.title.split()[0],
+        )
+
+
+class Case(NamedTuple):
+    """
+    Сценарий замера: один запрос к маршруту.
+
+    Args:
+        route: Имя маршрута с пространством имён
+        path: Строит адрес запроса по Fixtures
+        label: Уточнение, если у маршрута несколько сценариев
+        method: HTTP-метод
+        data: Строит данные запроса по Fixtures
+        user: Атрибут Fixtures с пользователем или None для анонима
+        status: Ожидаемый код ответа
+    """
+    route: str
+    path: Callable[[Fixtures], str]
+    label: str = ''
+    method: str = 'get'
+    data: Optional[Callable[[Fixtures], dict]] = None
+    user: Optional[str] = None
+    status: int = 200
+
+    @property
+    def name(self) -> str:
+        return f'{self.route} {self.label}'.strip()
+
+
+def url(name: str, *args: Callable[[Fixtures], object],
+        query: str = '') -> Callable[[Fixtures], str]:
+    """Адрес маршрута с аргументами, вычисляемыми по Fixtures."""
+    def build(fixtures: Fixtures) -> str:
+        return reverse(name, args=[arg(fixtures) for arg in args]) + query
+    return build
+
+
+def collect() -> List[Case]:
+    """Собирает CASES из всех модулей bench_*.py пакета."""
+    package = importlib.import_module(__package__)
+    cases = []
+    for module_info in pkgutil.iter_modules(package.__path__):
+        if module_info.name.startswith('bench_'):
+            module = importlib.import_module(
+                f'{__package__}.{module_info.name}')
+            cases.extend(module.CASES)
+    return cases
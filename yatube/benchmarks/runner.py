@@ -0,0 +1,195 @@
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.test import Client
+from django.test.utils import (override_settings, setup_test_environment,
+                               teardown_test_environment)
+
+import about.urls
+import posts.urls
+import users.urls
+from core.instrumentation import QueryTimer
+from posts import seed
+
+from .cases import Case, Fixtures, collect
+from .settings import (BASELINES_PATH, DATASETS, DEFAULT_TOLERANCE,
+                       MIN_REGRESSION_MS, REPEAT, SEED, TOLERANCE_ENV)
+
+BENCHMARK_SETTINGS = {
+    # Кеш в памяти процесса, чтобы не трогать файловый кеш разработчика
+    'CACHES': {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}},
+    # Хеширование паролей иначе заслоняет всё остальное в сценариях входа
+    'PASSWORD_HASHERS': ['django.contrib.auth.hashers.MD5PasswordHasher'],
+    # Случайная выборка лога запросов смешивалась бы с отчётом
+    'REQUEST_LOG_SAMPLE_RATE': 0,
+}
+METRICS = ('time_ms', 'queries', 'sql_ms')
+
+
+class Regression(NamedTuple):
+    dataset: str
+    case: str
+    metric: str
+    baseline: float
+    value: float
+
+    def __str__(self):
+        return (f'{self.dataset} {self.case}: {self.metric} '
+                f'{self.baseline:g} -> {self.value:g}')
+
+
+def routes() -> set:
+    """Имена всех маршрутов posts, users и about."""
+    return {f'{module.app_name}:{pattern.name}'
+            for module in (posts.urls, users.urls, about.urls)
+            for pattern in module.urlpatterns}
+
+
+def check_coverage(cases: Iterable[Case]) -> None:
+    missing = routes() - {case.route for case in cases}
+    if missing:
+        raise ValueError(
+            f'Нет сценариев для маршрутов: {", ".join(sorted(missing))}')
+
+
+def measure(case: Case, fixtures: Fixtures, repeat: int = REPEAT) -> dict:
+    """
+    Выполняет сценарий repeat раз после прогревочного запроса.
+
+    Каждый запрос идёт с холодным кешем и в транзакции, которая
+    откатывается, поэтому изменяющие сценарии не меняют набор данных.
+
+    Returns:
+        Медианы времени ответа и времени SQL в мс и число запросов
+    """
+    path = case.path(fixtures)
+    data = case.data(fixtures) if case.data else None
+    timings, sql_timings, queries = [], [], 0
+    for _ in range(repeat + 1):
+        for alias in settings.CACHES:
+            caches[alias].clear()
+        client = Client()
+        if case.user:
+            client.force_login(getattr(fixtures, case.user))
+        timer = QueryTimer()
+        with transaction.atomic(), connection.execute_wrapper(timer):
+            start = time.perf_counter()
+            response = getattr(client, case.method)(path, data)
+            elapsed = time.perf_counter() - start
+            transaction.set_rollback(True)
+        if response.status_code != case.status:
+            raise AssertionError(
+                f'{case.name}: код ответа {response.status_code}, '
+                f'ожидался {case.status}')
+        timings.append(elapsed)
+        sql_timings.append(timer.seconds)
+        queries = timer.count
+    # Первый запрос прогревает шаблоны и импорты и в медиану не входит
+    return {
+        'time_ms': round(statistics.median(timings[1:]) * 1000, 2),
+        'queries': queries,
+        'sql_ms': round(statistics.median(sql_timings[1:]) * 1000, 2),
+    }
+
+
+def run_dataset(dataset: str, cases: List[Case], repeat: int = REPEAT,
+                progress: Callable[[str, dict], None] = None) -> dict:
+    """
+    Создаёт тестовую базу, наполняет её набором dataset и замеряет
+    сценарии.
+
+    Returns:
+        Метрики по именам сценариев
+    """
+    old_name = connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False)
+    try:
+        seed.seed(**DATASETS[dataset], seed=SEED)
+        fixtures = Fixtures.load()
+        results = {}
+        for case in cases:
+            results[case.name] = measure(case, fixtures, repeat)
+            if progress:
+                progress(case.name, results[case.name])
+        return results
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def run(datasets: Iterable[str], repeat: int = REPEAT,
+        progress: Callable[[str, dict], None] = None) -> Dict[str, dict]:
+    """Замеряет все сценарии на каждом наборе данных."""
+    cases = collect()
+    check_coverage(cases)
+    # Изображения набора данных не должны попадать в MEDIA_ROOT проекта
+    media_root = tempfile.mkdtemp()
+    setup_test_environment()
+    try:
+        with override_settings(MEDIA_ROOT=media_root, **BENCHMARK_SETTINGS):
+            return {dataset: run_dataset(dataset, cases, repeat, progress)
+                    for dataset in datasets}
+    finally:
+        teardown_test_environment()
+        shutil.rmtree(media_root, ignore_errors=True)
+
+
+def tolerance() -> float:
+    return float(os.getenv(TOLERANCE_ENV, DEFAULT_TOLERANCE))
+
+
+def compare(results: Dict[str, dict], baselines: Dict[str, dict],
+            tolerance: Optional[float] = None) -> List[Regression]:
+    """
+    Находит регрессии относительно базовых значений.
+
+    Число запросов детерминировано и сравнивается точно. Времена зависят
+    от машины и сравниваются, только если задан допуск tolerance (доля от
+    базового значения), а прирост меньше MIN_REGRESSION_MS считается
+    шумом. Сценарии без базового значения пропускаются.
+    """
+    regressions = []
+    for dataset, cases in results.items():
+        for case, metrics in cases.items():
+            baseline = baselines.get(dataset, {}).get(case)
+            if baseline is None:
+                continue
+            for metric in METRICS:
+                value, base = metrics[metric], baseline[metric]
+                if metric == 'queries':
+                    regressed = value > base
+                elif tolerance is None:
+                    continue
+                else:
+                    regressed = (value > base * (1 + tolerance)
+                                 and value - base > MIN_REGRESSION_MS)
+                if regressed:
+                    regressions.append(
+                        Regression(dataset, case, metric, base, value))
+    return regressions
+
+
+def load_baselines(path: str = BASELINES_PATH) -> Dict[str, dict]:
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding='utf-8') as file:
+        return json.load(file)
+
+
+def save_baselines(results: Dict[str, dict],
+                   path: str = BASELINES_PATH) -> None:
+    """Записывает результаты поверх базовых значений тех же наборов."""
+    baselines = load_baselines(path)
+    baselines.update(results)
+    with open(path, 'w', encoding='utf-8') as file:
+        json.dump(baselines, file, ensure_ascii=False, indent=2,
+                  sort_keys=True)
+        file.write('\n')
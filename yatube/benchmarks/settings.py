@@ -0,0 +1,18 @@
+import os
+
+DATASETS = {
+    'small': dict(users=200, groups=10, posts=2000, follows=2000,
+                  comments=4000, image_share=0.2),
+    'medium': dict(users=2000, groups=30, posts=50000, follows=20000,
+                   comments=100000, image_share=0.2),
+    'large': dict(users=20000, groups=100, posts=500000, follows=200000,
+                  comments=1000000, image_share=0.2),
+}
+DEFAULT_DATASETS = ('small', 'medium')
+SEED = 0
+REPEAT = 5
+BASELINES_PATH = os.path.join(os.path.dirname(__file__), 'baselines.json')
+TOLERANCE_ENV = 'BENCHMARK_TOLERANCE'
+DEFAULT_TOLERANCE = 0.25
+# Прирост меньше этого считается шумом при любой доле
+MIN_REGRESSION_MS = 2
@@ -0,0 +1,254 @@
+"""
+Кеш в файле SQLite, общий для всех процессов на одном хосте.
+
+В отличие от LocMemCache записи и сброс версий видны всем воркерам,
+при этом не нужен отдельный сервер вроде memcached или redis. База
+открывается в режиме WAL: чтения не блокируются записью, а каждая запись
+идёт в транзакции BEGIN IMMEDIATE, поэтому incr атомарен между процессами.
+
+Пример настройки::
+
+    CACHES = {
+        'default': {
+            'BACKEND': 'core.cache_backends.sqlite.SQLiteCache',
+            'LOCATION': '/var/tmp/yatube-cache.sqlite3',
+            'OPTIONS': {'MAX_ENTRIES': 10000, 'CULL_FREQUENCY': 4,
+                        'CULL_INTERVAL': 100},
+        }
+    }
+"""
+import os
+import pickle
+import random
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# SQLite по умолчанию ограничивает число параметров в запросе
+MAX_QUERY_PARAMS = 900
+# Время последнего обращения обновляется не чаще, чем раз в столько секунд,
+# чтобы чтение почти никогда не превращалось в запись
+ACCESS_GRANULARITY = 60
+BUSY_TIMEOUT = 5
+# В среднем через сколько записей проверяется переполнение: подсчёт
+# записей обходит всю таблицу
+DEFAULT_CULL_INTERVAL = 100
+
+SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS cache ('
+    ' key TEXT PRIMARY KEY,'
+    ' value BLOB NOT NULL,'
+    ' expires REAL,'
+    ' accessed REAL NOT NULL'
+    ') WITHOUT ROWID',
+    'CREATE INDEX IF NOT EXISTS cache_accessed_idx ON cache (accessed)',
+    'CREATE INDEX IF NOT EXISTS cache_expires_idx ON cache (expires)',
+)
+
+
+def _chunks(items: list, size: int = MAX_QUERY_PARAMS):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _placeholders(count: int) -> str:
+    return ', '.join('?' * count)
+
+
+class SQLiteCache(BaseCache):
+    """
+    Кеш Django поверх WAL-базы SQLite.
+
+    Вытеснение приближённо LRU: когда записей становится больше
+    MAX_ENTRIES, удаляются просроченные, а затем 1/CULL_FREQUENCY самых
+    давно читанных записей. Переполнение проверяется не при каждой
+    записи, а с вероятностью 1/CULL_INTERVAL, поэтому между проверками
+    записей может стать чуть больше MAX_ENTRIES.
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        self._location = location
+        self._local = threading.local()
+        options = params.get('OPTIONS', {})
+        self._cull_interval = max(
+            int(options.get('CULL_INTERVAL', DEFAULT_CULL_INTERVAL)), 1)
+
+    def _connection(self) -> sqlite3.Connection:
+        # Соединение своё у каждого потока и у каждого процесса: после
+        # fork унаследованное соединение использовать нельзя
+        pid = os.getpid()
+        connection = getattr(self._local, 'connection', None)
+        if connection is None or self._local.pid != pid:
+            connection = self._connect()
+            self._local.connection = connection
+            self._local.pid = pid
+        return connection
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self._location)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(
+            self._location, timeout=BUSY_TIMEOUT, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        for statement in SCHEMA:
+            connection.execute(statement)
+        return connection
+
+    @contextmanager
+    def _write(self):
+        connection = self._connection()
+        connection.execute('BEGIN IMMEDIATE')
+        try:
+            yield connection
+        except BaseException:
+            connection.execute('ROLLBACK')
+            raise
+        connection.execute('COMMIT')
+
+    def _expiry(self, timeout):
+        return self.get_backend_timeout(timeout)
+
+    def _cull(self, connection, now: float) -> None:
+        if random.random() >= 1 / self._cull_interval:
+            return
+        connection.execute(
+            'DELETE FROM cache WHERE expires IS NOT NULL AND expires <= ?',
+            (now,))
+        count, = connection.execute('SELECT COUNT(*) FROM cache').fetchone()
+        if count <= self._max_entries:
+            return
+        if not self._cull_frequency:
+            connection.execute('DELETE FROM cache')
+            return
+        connection.execute(
+            'DELETE FROM cache WHERE key IN ('
+            ' SELECT key FROM cache ORDER BY accessed LIMIT ?)',
+            (count // self._cull_frequency,))
+
+    def get_many(self, keys, version=None):
+        keys = list(keys)
+        made = {}
+        for key in keys:
+            made_key = self.make_key(key, version=version)
+            self.validate_key(made_key)
+            made[made_key] = key
+        connection = self._connection()
+        now = time.time()
+        found = {}
+        stale = []
+        for chunk in _chunks(list(made)):
+            rows = connection.execute(
+                'SELECT key, value, accessed FROM cache'
+                f' WHERE key IN ({_placeholders(len(chunk))})'
+                ' AND (expires IS NULL OR expires > ?)',
+                (*chunk, now))
+            for made_key, value, accessed in rows:
+                found[made[made_key]] = pickle.loads(value)
+                if now - accessed > ACCESS_GRANULARITY:
+                    stale.append(made_key)
+        for chunk in _chunks(stale):
+            connection.execute(
+                'UPDATE cache SET accessed = ?'
+                f' WHERE key IN ({_placeholders(len(chunk))})',
+                (now, *chunk))
+        return found
+
+    def get(self, key, default=None, version=None):
+        return self.get_many([key], version=version).get(key, default)
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        expires = self._expiry(timeout)
+        now = time.time()
+        rows = []
+        for key, value in data.items():
+            made_key = self.make_key(key, version=version)
+            self.validate_key(made_key)
+            rows.append((made_key,
+                         pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                         expires, now))
+        with self._write() as connection:
+            connection.executemany(
+                'INSERT OR REPLACE INTO cache (key, value, expires, accessed)'
+                ' VALUES (?, ?, ?, ?)', rows)
+            self._cull(connection, now)
+        return []
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self.set_many({key: value}, timeout=timeout, version=version)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_key(key, version=version)
+        self.validate_key(made_key)
+        now = time.time()
+        with self._write() as connection:
+            connection.execute(
+                'DELETE FROM cache WHERE key = ? AND expires <= ?',
+                (made_key, now))
+            added = connection.execute(
+                'INSERT OR IGNORE INTO cache (key, value, expires, accessed)'
+                ' VALUES (?, ?, ?, ?)',
+                (made_key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL),
+                 self._expiry(timeout), now)).rowcount == 1
+            if added:
+                self._cull(connection, now)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        made_key = self.make_key(key, version=version)
+        self.validate_key(made_key)
+        now = time.time()
+        with self._write() as connection:
+            return connection.execute(
+                'UPDATE cache SET expires = ?, accessed = ?'
+                ' WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (self._expiry(timeout), now, made_key, now)).rowcount == 1
+
+    def incr(self, key, delta=1, version=None):
+        made_key = self.make_key(key, version=version)
+        self.validate_key(made_key)
+        now = time.time()
+        with self._write() as connection:
+            row = connection.execute(
+                'SELECT value FROM cache'
+                ' WHERE key = ? AND (expires IS NULL OR expires > ?)',
+                (made_key, now)).fetchone()
+            if row is None:
+                raise ValueError("Key '%s' not found" % key)
+            value = pickle.loads(row[0]) + delta
+            connection.execute(
+                'UPDATE cache SET value = ?, accessed = ? WHERE key = ?',
+                (pickle.dumps(value, pickle.HIGHEST_PROTOCOL), now, made_key))
+        return value
+
+    def has_key(self, key, version=None):
+        made_key = self.make_key(key, version=version)
+        self.validate_key(made_key)
+        return self._connection().execute(
+            'SELECT 1 FROM cache'
+            ' WHERE key = ? AND (expires IS NULL OR expires > ?)',
+            (made_key, time.time())).fetchone() is not None
+
+    def delete_many(self, keys, version=None):
+        made_keys = []
+        for key in keys:
+            made_key = self.make_key(key, version=version)
+            self.validate_key(made_key)
+            made_keys.append(made_key)
+        with self._write() as connection:
+            for chunk in _chunks(made_keys):
+                connection.execute(
+                    'DELETE FROM cache'
+                    f' WHERE key IN ({_placeholders(len(chunk))})', chunk)
+
+    def delete(self, key, version=None):
+        self.delete_many([key], version=version)
+
+    def clear(self):
+        with self._write() as connection:
+            connection.execute('DELETE FROM cache')
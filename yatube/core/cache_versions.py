@@ -0,0 +1,60 @@
+import time
+
+from django.core.cache import cache
+
+VERSION_KEY_PREFIX = 'version'
+VERSION_TIMEOUT = None
+
+
+def _version_key(name: str) -> str:
+    return f'{VERSION_KEY_PREFIX}:{name}'
+
+
+def _initial_version() -> int:
+    """
+    Начальное значение версии.
+
+    Берётся от текущего времени, чтобы после вытеснения ключа из кеша
+    новая версия не совпала с уже использованной и не подняла старые
+    записи.
+    """
+    return int(time.time() * 1000)
+
+
+def get_versions(*names: str) -> dict:
+    """
+    Возвращает текущие версии для набора имён одним запросом к кешу.
+
+    Args:
+        names: Имена версионируемых сущностей
+    Returns:
+        Словарь {имя: версия}
+    """
+    keys = {_version_key(name): name for name in names}
+    found = cache.get_many(keys)
+    versions = {keys[key]: value for key, value in found.items()}
+    missing = {key: _initial_version()
+               for key in keys if key not in found}
+    if missing:
+        for key, value in missing.items():
+            cache.add(key, value, VERSION_TIMEOUT)
+        versions.update({keys[key]: value for key, value in missing.items()})
+    return versions
+
+
+def get_version(name: str) -> int:
+    """Возвращает текущую версию сущности `name`."""
+    return get_versions(name)[name]
+
+
+def bump_version(*names: str) -> None:
+    """
+    Увеличивает версии сущностей, делая недоступными все записи кеша,
+    построенные на предыдущих версиях.
+    """
+    for name in names:
+        key = _version_key(name)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, _initial_version(), VERSION_TIMEOUT)
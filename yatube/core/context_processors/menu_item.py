@@ -1,28 +1,76 @@
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
 
+from ..cache_versions import bump_version, get_version
+from ..instrumentation import timed
+from ..settings import MENU_CACHE_TIMEOUT
 
-def group_lists(request):
-    """"""
+MENU_VERSION = 'menu'
+
+
+def invalidate_menu() -> None:
+    """
+    Сбрасывает закешированное меню после фиксации текущей транзакции.
+
+    До фиксации параллельный запрос ещё видит старые счётчики и мог бы
+    закешировать устаревшее меню под новой версией.
+    """
+    transaction.on_commit(lambda: bump_version(MENU_VERSION))
+
+
+def _get_cached(name, build):
+    """
+    Возвращает пункты меню из общего кеша, строя их при промахе.
+
+    Ключ включает версию меню, которую увеличивают счётчики публикаций
+    и сигналы при изменении групп и пользователей.
+    """
+    with timed('menu'):
+        version = get_version(MENU_VERSION)
+        key = f'menu:{name}:{version}'
+        items = cache.get(key)
+        if items is None:
+            items = build()
+            cache.set(key, items, MENU_CACHE_TIMEOUT)
+    return version, items
+
+
+def _build_group_lists():
     group_model = apps.get_model('posts', 'Group')
-    post_model = apps.get_model('posts', 'Post')
-    groups = []
-    for group in group_model.objects.all():
-        if post_model.objects.filter(group__pk=group.pk).count():
-            groups.append(group)
+    return list(
+        group_model.objects
+        .filter(posts_count__gt=0)
+        .values('title', 'slug', 'description')
+    )
+
+
+def _build_author_lists():
+    user_model = get_user_model()
+    authors = (
+        user_model.objects
+        .filter(stats__posts_count__gt=0)
+        .values_list('username', 'first_name', 'last_name')
+    )
+    return [{'username': username,
+             'full_name': f'{first_name} {last_name}'.strip()}
+            for username, first_name, last_name in authors]
+
+
+def group_lists(request):
+    """Группы, в которых есть хотя бы один пост."""
+    version, groups = _get_cached('groups', _build_group_lists)
     return {
-        'menu_group_lists': groups
+        'menu_group_lists': groups,
+        'menu_version': version,
     }
 
 
 def author_lists(request):
-    """"""
-    user_model = get_user_model()
-    authors = []
-    for user in user_model.objects.all():
-        if user.posts.count():
-            authors.append({'username': user.username,
-                            'full_name': user.get_full_name()})
+    """Авторы, у которых есть хотя бы один пост."""
+    version, authors = _get_cached('authors', _build_author_lists)
     return {
-        'menu_author_lists': authors
+        'menu_author_lists': authors,
+        'menu_version': version,
     }
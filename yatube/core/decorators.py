@@ -0,0 +1,118 @@
+import hashlib
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.views.decorators.http import condition
+
+from .cache_versions import get_versions
+from .context_processors.menu_item import MENU_VERSION
+from .settings import PAGE_CACHE_TIMEOUT
+
+PAGE_CACHE_KEY_PREFIX = 'page'
+
+
+def _is_anonymous(request) -> bool:
+    # Наличие сессии проверяется по cookie, чтобы не читать её из базы
+    return (settings.SESSION_COOKIE_NAME not in request.COOKIES
+            and not request.user.is_authenticated)
+
+
+def _is_shareable(request, response) -> bool:
+    """
+    Проверяет, что ответ одинаков для всех анонимных посетителей.
+
+    Cookie выставляются middleware уже после представления, поэтому
+    проверяется не сам ответ, а признаки, по которым они появятся.
+    """
+    session = getattr(request, 'session', None)
+    return (response.status_code == 200
+            and not response.streaming
+            and not response.cookies
+            and not request.META.get('CSRF_COOKIE_USED')
+            and not (session is not None and session.modified))
+
+
+def _versions_stamp(request, get_scopes, args, kwargs):
+    """
+    Возвращает строку из версий, от которых зависит страница.
+
+    Результат запоминается на запросе: ETag и кеш страницы вычисляют его
+    для одного и того же запроса, а поиск объектов для версий может
+    стоить запроса к базе.
+    """
+    stamps = request.__dict__.setdefault('_versions_stamps', {})
+    if get_scopes not in stamps:
+        scopes = get_scopes(request, *args, **kwargs)
+        if scopes is None:
+            stamps[get_scopes] = None
+        else:
+            names = (MENU_VERSION, *scopes)
+            versions = get_versions(*names)
+            stamps[get_scopes] = '.'.join(
+                str(versions[name]) for name in names)
+    return stamps[get_scopes]
+
+
+def _page_key(request, stamp) -> str:
+    url = hashlib.md5(request.build_absolute_uri().encode()).hexdigest()
+    return f'{PAGE_CACHE_KEY_PREFIX}:{url}:{stamp}'
+
+
+def anonymous_page_cache(get_scopes, timeout=PAGE_CACHE_TIMEOUT):
+    """
+    Кеширует страницу целиком для анонимных посетителей.
+
+    Ключ строится из полного URL и версий всех сущностей, от которых
+    зависит страница, поэтому запись перестаёт использоваться, как только
+    сигналы увеличат любую из версий. Авторизованные пользователи и
+    посетители с cookie сессии получают страницу без кеша. Настройка
+    ANONYMOUS_PAGE_CACHE = False отключает кеш для всех.
+
+    Args:
+        get_scopes: Функция (request, *args, **kwargs), возвращающая
+            имена версий страницы или None, если кешировать не нужно
+        timeout: Время жизни записи в секундах
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not settings.ANONYMOUS_PAGE_CACHE \
+                    or request.method not in ('GET', 'HEAD') \
+                    or not _is_anonymous(request):
+                return view(request, *args, **kwargs)
+            stamp = _versions_stamp(request, get_scopes, args, kwargs)
+            if stamp is None:
+                return view(request, *args, **kwargs)
+            key = _page_key(request, stamp)
+            response = cache.get(key)
+            if response is not None:
+                return response
+            response = view(request, *args, **kwargs)
+            if _is_shareable(request, response):
+                cache.set(key, response, timeout)
+            return response
+        return wrapper
+    return decorator
+
+
+def anonymous_etag(get_scopes):
+    """
+    Отвечает анонимным посетителям 304, если страница не менялась.
+
+    ETag строится из тех же версий, что и ключ кеша страницы, поэтому
+    проверка If-None-Match не требует ни запросов ленты, ни рендеринга.
+    Авторизованным пользователям ETag не выдаётся: их страницы зависят
+    от подписок и сессии, которые версии не отражают.
+
+    Args:
+        get_scopes: Функция (request, *args, **kwargs), возвращающая
+            имена версий страницы или None, если страницы нет
+    """
+    def etag(request, *args, **kwargs):
+        if not _is_anonymous(request):
+            return None
+        stamp = _versions_stamp(request, get_scopes, args, kwargs)
+        if stamp is not None:
+            return hashlib.md5(stamp.encode()).hexdigest()
+    return condition(etag_func=etag)
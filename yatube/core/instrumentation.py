@@ -0,0 +1,87 @@
+"""
+Замеры времени обработки запроса по составляющим.
+
+Метрики текущего запроса лежат в contextvars, поэтому код, который хочет
+отчитаться о своём времени, не получает их через аргументы: timed()
+ничего не делает вне запроса, открытого RequestTimingMiddleware. Запросы
+к базе считает обёртка execute, время рендеринга шаблонов — бэкенд
+core.template_backends.instrumented.
+"""
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Optional
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class QueryTimer:
+    """Обёртка execute, считающая запросы и их суммарное время."""
+
+    def __init__(self):
+        self.count = 0
+        self.seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = QueryTimer()
+        self.view_start = None
+        self.view_seconds = None
+        # Секунды по именам участков, включая template
+        self.spans = defaultdict(float)
+        self._depth = defaultdict(int)
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.start
+
+    @contextmanager
+    def span(self, name: str):
+        # Вложенные участки с тем же именем, например шаблон внутри
+        # шаблона, не должны учитываться дважды
+        self._depth[name] += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._depth[name] -= 1
+            if not self._depth[name]:
+                self.spans[name] += time.perf_counter() - start
+
+
+def current() -> Optional[RequestMetrics]:
+    """Метрики запроса, обрабатываемого в этом контексте, или None."""
+    return _current.get()
+
+
+@contextmanager
+def collect():
+    """Открывает метрики нового запроса на время блока."""
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timed(name: str):
+    """Добавляет время блока к участку name текущего запроса."""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.span(name):
+        yield
@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import runner
+from benchmarks.settings import DATASETS, DEFAULT_DATASETS, REPEAT
+
+
+class Command(BaseCommand):
+    help = ('Замеряет время, число SQL-запросов и время SQL маршрутов '
+            'на синтетических наборах данных и сравнивает с baselines.json')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--datasets', nargs='+', choices=DATASETS,
+            default=DEFAULT_DATASETS,
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=REPEAT,
+            help='Число замеров каждого сценария',
+        )
+        parser.add_argument(
+            '--check-times', action='store_true',
+            help='Проверять и время; базовые значения должны быть сняты '
+                 'на этой же машине с --update',
+        )
+        parser.add_argument(
+            '--tolerance', type=float, default=None,
+            help='Допустимый рост времени, доля от базового значения; '
+                 'по умолчанию из BENCHMARK_TOLERANCE',
+        )
+        parser.add_argument(
+            '--update', action='store_true',
+            help='Записать результаты как новые базовые значения',
+        )
+
+    def handle(self, *args, datasets, repeat, check_times, tolerance, update,
+               **options):
+        def progress(case, metrics):
+            self.stdout.write(
+                f'{case:<45} {metrics["time_ms"]:>9.2f} ms '
+                f'{metrics["queries"]:>4} queries '
+                f'{metrics["sql_ms"]:>9.2f} ms SQL')
+
+        if repeat < 1:
+            raise CommandError('--repeat должен быть не меньше 1')
+        try:
+            results = runner.run(datasets, repeat, progress)
+        except (ValueError, AssertionError) as error:
+            raise CommandError(error)
+        if update:
+            runner.save_baselines(results)
+            self.stdout.write(self.style.SUCCESS(
+                'Базовые значения обновлены'))
+            return
+        if not check_times:
+            tolerance = None
+        elif tolerance is None:
+            tolerance = runner.tolerance()
+        regressions = runner.compare(results, runner.load_baselines(),
+                                     tolerance)
+        if regressions:
+            raise CommandError('Регрессии:\n' + '\n'.join(
+                str(regression) for regression in regressions))
+        self.stdout.write(self.style.SUCCESS('Регрессий нет'))
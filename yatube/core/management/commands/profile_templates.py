@@ -0,0 +1,84 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+
+from core.template_profiler import CACHE, profile_templates
+
+PROFILE_SETTINGS = {
+    # Отдельный кеш в памяти: прогоны не должны ни читать, ни засорять
+    # кеш сайта
+    'CACHES': {'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'profile-templates'}},
+    # Иначе после прогревочного запроса анонимная страница целиком
+    # отдаётся из кеша и шаблоны не рендерятся вовсе
+    'ANONYMOUS_PAGE_CACHE': False,
+    'ALLOWED_HOSTS': ['testserver'],
+}
+
+
+class Command(BaseCommand):
+    help = ('Рендерит страницу несколько раз и выводит время по '
+            'подключаемым шаблонам и фрагментам кеша')
+
+    def add_arguments(self, parser):
+        parser.add_argument('url', help='Адрес страницы, например /')
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Число замеряемых запросов после прогревочного',
+        )
+        parser.add_argument(
+            '--user', help='Имя пользователя, от которого идут запросы',
+        )
+        parser.add_argument(
+            '--cold', action='store_true',
+            help='Очищать кеш перед каждым запросом',
+        )
+
+    def handle(self, *args, url, repeat, user, cold, **options):
+        if repeat < 1:
+            raise CommandError('--repeat должен быть не меньше 1')
+        with override_settings(**PROFILE_SETTINGS):
+            client = Client()
+            if user:
+                try:
+                    client.force_login(
+                        get_user_model().objects.get(username=user))
+                except get_user_model().DoesNotExist:
+                    raise CommandError(f'Нет пользователя {user}')
+            self._get(client, url, cold)
+            with profile_templates() as profile:
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    self._get(client, url, cold)
+                elapsed = time.perf_counter() - start
+        self._report(profile, repeat, elapsed)
+
+    def _get(self, client, url, cold):
+        if cold:
+            for alias in settings.CACHES:
+                caches[alias].clear()
+        response = client.get(url)
+        if response.status_code != 200:
+            raise CommandError(f'{url}: код ответа {response.status_code}')
+
+    def _report(self, profile, repeat, elapsed):
+        per_request = elapsed / repeat * 1000
+        self.stdout.write(f'{repeat} запросов, в среднем '
+                          f'{per_request:.2f} ms на запрос\n')
+        self.stdout.write(
+            f'{"фрагмент":<55} {"вызовы":>7} {"промахи":>8} '
+            f'{"своё, ms":>9} {"всего, ms":>10} {"доля":>6}')
+        for kind, name, stats in profile.ranked():
+            misses = stats.misses if kind == CACHE else ''
+            own = stats.own / repeat * 1000
+            self.stdout.write(
+                f'{kind + " " + name:<55} {stats.calls / repeat:>7g} '
+                f'{misses:>8} {own:>9.2f} '
+                f'{stats.total / repeat * 1000:>10.2f} '
+                f'{own / per_request:>6.0%}')
@@ -0,0 +1,94 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+
+from . import instrumentation
+from .settings import SLOW_REQUEST_MS, SLOW_REQUEST_MS_BY_VIEW
+
+logger = logging.getLogger('core.requests')
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+class RequestTimingMiddleware:
+    """
+    Замеряет запрос по составляющим и сообщает результат.
+
+    Считаются общее время, время представления, число и время запросов к
+    базе и участки из core.instrumentation: рендеринг шаблонов, меню,
+    миниатюры. Строка JSON пишется в лог core.requests для доли
+    REQUEST_LOG_SAMPLE_RATE из настроек Django запросов и для всех, что
+    медленнее порога своего представления. Заголовок Server-Timing
+    получают только сотрудники и режим DEBUG, чтобы не раскрывать
+    устройство сайта.
+
+    Замер включён всегда: выборка решает только, попадёт ли запрос в лог,
+    а медленный запрос заранее не распознать. Должен стоять первым в
+    MIDDLEWARE, чтобы общее время включало остальные middleware.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with instrumentation.collect() as metrics, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(metrics.queries))
+            response = self.get_response(request)
+            if metrics.view_start is not None:
+                metrics.view_seconds = metrics.elapsed - metrics.view_start
+            total = metrics.elapsed
+        self._report(request, response, metrics, total)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        metrics = instrumentation.current()
+        if metrics is not None:
+            metrics.view_start = metrics.elapsed
+
+    def _report(self, request, response, metrics, total) -> None:
+        match = request.resolver_match
+        view_name = match.view_name if match else None
+        total_ms = _ms(total)
+        slow = total_ms > SLOW_REQUEST_MS_BY_VIEW.get(view_name,
+                                                      SLOW_REQUEST_MS)
+        if slow or random.random() < settings.REQUEST_LOG_SAMPLE_RATE:
+            record = {
+                'method': request.method,
+                'path': request.path,
+                'view': view_name,
+                'status': response.status_code,
+                'total_ms': total_ms,
+                'view_ms': (_ms(metrics.view_seconds)
+                            if metrics.view_seconds is not None else None),
+                'db_queries': metrics.queries.count,
+                'db_ms': _ms(metrics.queries.seconds),
+                **{f'{name}_ms': _ms(seconds)
+                   for name, seconds in metrics.spans.items()},
+                'slow': slow,
+            }
+            logger.log(logging.WARNING if slow else logging.INFO,
+                       json.dumps(record, ensure_ascii=False))
+        user = getattr(request, 'user', None)
+        if settings.DEBUG or (user is not None and user.is_staff):
+            response['Server-Timing'] = self._server_timing(metrics, total)
+
+    @staticmethod
+    def _server_timing(metrics, total) -> str:
+        entries = [
+            f'db;dur={_ms(metrics.queries.seconds)};'
+            f'desc="{metrics.queries.count} queries"',
+        ]
+        if metrics.view_seconds is not None:
+            entries.append(f'view;dur={_ms(metrics.view_seconds)}')
+        entries.extend(f'{name};dur={_ms(seconds)}'
+                       for name, seconds in metrics.spans.items())
+        entries.append(f'total;dur={_ms(total)}')
+        return ', '.join(entries)
@@ -0,0 +1,13 @@
+MENU_CACHE_TIMEOUT = 60 * 60 * 24
+PAGE_CACHE_TIMEOUT = 60 * 5
+TASKS_MAX_WORKERS = 2
+SLOW_REQUEST_MS = 500
+# Порог для представлений, которым медленность положена по природе:
+# загрузка изображений и хеширование паролей
+SLOW_REQUEST_MS_BY_VIEW = {
+    'posts:post_create': 2000,
+    'posts:post_edit': 2000,
+    'users:signup': 1000,
+    'users:login': 1000,
+    'users:password_change_form': 1000,
+}
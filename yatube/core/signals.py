@@ -0,0 +1,20 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .context_processors.menu_item import invalidate_menu
+
+
+# Появление и исчезновение пунктов меню при изменении постов отслеживают
+# счётчики публикаций: меню сбрасывается после их обновления
+@receiver((post_save, post_delete), sender='posts.Group')
+def invalidate_menu_on_group_change(sender, **kwargs):
+    invalidate_menu()
+
+
+@receiver((post_save, post_delete), sender=settings.AUTH_USER_MODEL)
+def invalidate_menu_on_user_change(sender, update_fields=None, **kwargs):
+    # Вход пользователя обновляет только last_login, меню от него не зависит
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    invalidate_menu()
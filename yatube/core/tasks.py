@@ -0,0 +1,51 @@
+"""
+Фоновое выполнение задач в пуле потоков процесса.
+
+Задачи ставятся в очередь только после фиксации транзакции, чтобы поток
+увидел сохранённые данные. Очередь не переживает перезапуск процесса,
+поэтому для всего, что должно быть выполнено гарантированно, нужна
+команда досчёта.
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.db import connections, transaction
+
+from .settings import TASKS_MAX_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_executor = None
+_executor_pid = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor, _executor_pid
+    with _lock:
+        # Пул, унаследованный через fork, не имеет живых потоков
+        if _executor is None or _executor_pid != os.getpid():
+            _executor = ThreadPoolExecutor(
+                max_workers=TASKS_MAX_WORKERS,
+                thread_name_prefix='yatube-task',
+            )
+            _executor_pid = os.getpid()
+        return _executor
+
+
+def _run(func, args, kwargs) -> None:
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception('Фоновая задача %s завершилась с ошибкой',
+                         func.__qualname__)
+    finally:
+        connections.close_all()
+
+
+def run_in_background(func, *args, **kwargs) -> None:
+    """Выполняет func(*args, **kwargs) в фоне после фиксации транзакции."""
+    transaction.on_commit(
+        lambda: _get_executor().submit(_run, func, args, kwargs))
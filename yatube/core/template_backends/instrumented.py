@@ -0,0 +1,36 @@
+"""
+Бэкенд шаблонов Django, отчитывающийся о времени рендеринга.
+
+Время попадает в участок template метрик текущего запроса. Замеряется
+только рендеринг через бэкенд, то есть render() и render_to_string();
+include и inclusion-теги входят во время внешнего шаблона.
+
+Пример настройки::
+
+    TEMPLATES = [{
+        'BACKEND': 'core.template_backends.instrumented.'
+                   'InstrumentedDjangoTemplates',
+        ...
+    }]
+"""
+from django.template.backends.django import DjangoTemplates, Template
+
+from ..instrumentation import timed
+
+TEMPLATE_SPAN = 'template'
+
+
+class InstrumentedTemplate(Template):
+    def render(self, context=None, request=None):
+        with timed(TEMPLATE_SPAN):
+            return super().render(context, request)
+
+
+class InstrumentedDjangoTemplates(DjangoTemplates):
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return InstrumentedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return InstrumentedTemplate(template.template, self)
@@ -0,0 +1,129 @@
+"""
+Профилирование рендеринга шаблонов по фрагментам.
+
+Внутри profile_templates() рендеринг шаблонов и узлов {% cache %}
+замеряется по имени шаблона или фрагмента: число вызовов,
+полное время и собственное время без вложенных замеренных узлов. Для
+фрагментов кеша дополнительно считаются промахи, то есть случаи, когда
+содержимое действительно рендерилось.
+
+Шаблоны замеряются на Template.render, а не на узлах {% include %}:
+так учитываются и inclusion-теги, и шаблоны, которые теги рендерят сами,
+например карточки постов в {% post_cards %}.
+
+Методы render подменяются на уровне классов, поэтому профилирование
+затрагивает все потоки процесса и предназначено для отдельного запуска,
+например командой profile_templates, а не для рабочего сервера.
+"""
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Tuple
+
+from django.template.base import Template
+from django.templatetags.cache import CacheNode
+
+TEMPLATE = 'template'
+CACHE = 'cache'
+
+
+class FragmentStats:
+    def __init__(self):
+        self.calls = 0
+        self.misses = 0
+        self.total = 0.0
+        self.own = 0.0
+
+
+def _template_name(template: Template, context) -> str:
+    # У шаблонов из строки имени нет
+    return template.name or '<string>'
+
+
+def _cache_name(node: CacheNode, context) -> str:
+    return node.fragment_name
+
+
+class _MissCounter:
+    """Подменяет nodelist узла кеша: его рендер означает промах."""
+
+    def __init__(self, nodelist, stats: FragmentStats):
+        self.nodelist = nodelist
+        self.stats = stats
+
+    def render(self, context):
+        self.stats.misses += 1
+        return self.nodelist.render(context)
+
+
+class TemplateProfile:
+    def __init__(self):
+        self.stats: Dict[Tuple[str, str], FragmentStats] = {}
+        # Время вложенных замеренных узлов для каждого уровня рендеринга
+        self._nested: List[float] = []
+
+    def measure(self, kind: str, name: str, render: Callable, node,
+                context):
+        """Рендерит node, учитывая время под именем (kind, name)."""
+        stats = self.stats.setdefault((kind, name), FragmentStats())
+        stats.calls += 1
+        if kind == CACHE:
+            nodelist = node.nodelist
+            node.nodelist = _MissCounter(nodelist, stats)
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            return render(node, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._nested.pop()
+            stats.total += elapsed
+            stats.own += elapsed - nested
+            if self._nested:
+                self._nested[-1] += elapsed
+            if kind == CACHE:
+                node.nodelist = nodelist
+
+    def ranked(self) -> List[Tuple[str, str, FragmentStats]]:
+        """Фрагменты по убыванию собственного времени."""
+        return sorted(((kind, name, stats)
+                       for (kind, name), stats in self.stats.items()),
+                      key=lambda item: item[2].own, reverse=True)
+
+
+PROFILED_CLASSES = (
+    (Template, TEMPLATE, _template_name),
+    (CacheNode, CACHE, _cache_name),
+)
+
+
+def _profiled_render(profile: TemplateProfile, kind: str,
+                     get_name: Callable, render: Callable) -> Callable:
+    def profiled(node, context):
+        return profile.measure(kind, get_name(node, context), render, node,
+                               context)
+    return profiled
+
+
+@contextmanager
+def profile_templates():
+    """
+    Замеряет рендеринг фрагментов шаблонов на время блока.
+
+    Пример::
+
+        with profile_templates() as profile:
+            client.get('/')
+        for kind, name, stats in profile.ranked():
+            ...
+    """
+    profile = TemplateProfile()
+    originals = [(profiled_class, profiled_class.render)
+                 for profiled_class, _, _ in PROFILED_CLASSES]
+    for profiled_class, kind, get_name in PROFILED_CLASSES:
+        profiled_class.render = _profiled_render(
+            profile, kind, get_name, profiled_class.render)
+    try:
+        yield profile
+    finally:
+        for profiled_class, render in originals:
+            profiled_class.render = render
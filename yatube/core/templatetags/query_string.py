@@ -0,0 +1,21 @@
+from django import template
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def query_string(context, **kwargs):
+    """
+    Возвращает строку запроса текущей страницы с заменёнными параметрами.
+
+    Параметры со значением None удаляются. Пример:
+    <a href="{% query_string page=2 %}">, где остальные параметры, например
+    поисковый запрос q, сохраняются.
+    """
+    query = context['request'].GET.copy()
+    for key, value in kwargs.items():
+        if value is None:
+            query.pop(key, None)
+        else:
+            query[key] = value
+    return f'?{query.urlencode()}'
@@ -0,0 +1,30 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+TEST_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'tests',
+    }
+}
+
+
+class CacheClearingTestRunner(DiscoverRunner):
+    """
+    Подменяет кеш на чистый кеш в памяти на время прогона тестов.
+
+    Кеш по умолчанию хранится в общем файле и переживает перезапуск:
+    тесты видели бы записи прошлых прогонов, а очистка стёрла бы кеш
+    разработчика или сервера. Выборка лога запросов отключается, чтобы
+    строки JSON не перемешивались с выводом тестов.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._settings_override = override_settings(
+            CACHES=TEST_CACHES, REQUEST_LOG_SAMPLE_RATE=0)
+        self._settings_override.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._settings_override.disable()
+        super().teardown_test_environment(**kwargs)
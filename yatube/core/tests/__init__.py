@@ -0,0 +1,19 @@
+from contextlib import contextmanager
+
+from django.db import connection
+
+
+@contextmanager
+def execute_on_commit():
+    """
+    Выполняет колбэки transaction.on_commit, добавленные внутри блока.
+
+    TestCase оборачивает тест в транзакцию, которая не фиксируется,
+    поэтому иначе такие колбэки не выполнились бы никогда.
+    """
+    start = len(connection.run_on_commit)
+    yield
+    callbacks = connection.run_on_commit[start:]
+    del connection.run_on_commit[start:]
+    for _, callback in callbacks:
+        callback()
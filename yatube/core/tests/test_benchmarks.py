@@ -0,0 +1,60 @@
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import SimpleTestCase
+
+from benchmarks import runner
+from benchmarks.cases import collect
+
+
+class BenchmarkTests(SimpleTestCase):
+    def test_every_route_has_case(self):
+        """У каждого маршрута posts, users и about есть сценарий."""
+        runner.check_coverage(collect())
+
+    def test_case_names_are_unique(self):
+        """Имена сценариев — ключи baselines.json и не повторяются."""
+        names = [case.name for case in collect()]
+        self.assertEqual(len(names), len(set(names)))
+
+    def test_compare(self):
+        """Регрессия — рост числа запросов или времени сверх допуска."""
+        baselines = {'small': {'case': {
+            'time_ms': 100, 'queries': 5, 'sql_ms': 1}}}
+        results = {
+            'within tolerance': {'time_ms': 120, 'queries': 5, 'sql_ms': 1},
+            'noise': {'time_ms': 100, 'queries': 5, 'sql_ms': 2.5},
+            'slower': {'time_ms': 130, 'queries': 5, 'sql_ms': 1},
+            'more queries': {'time_ms': 100, 'queries': 6, 'sql_ms': 1},
+        }
+        for label, metrics in results.items():
+            with self.subTest(label=label):
+                regressions = runner.compare(
+                    {'small': {'case': metrics}}, baselines, tolerance=0.25)
+                self.assertEqual(
+                    [regression.metric for regression in regressions],
+                    {'slower': ['time_ms'],
+                     'more queries': ['queries']}.get(label, []))
+        self.assertEqual(
+            runner.compare({'medium': {'case': results['slower']}},
+                           baselines, tolerance=0.25), [])
+
+    def test_compare_only_queries_by_default(self):
+        """Без допуска время не проверяется, число запросов — всегда."""
+        baselines = {'small': {'case': {
+            'time_ms': 100, 'queries': 5, 'sql_ms': 1}}}
+        results = {'small': {'case': {
+            'time_ms': 1000, 'queries': 6, 'sql_ms': 10}}}
+        self.assertEqual(
+            [regression.metric
+             for regression in runner.compare(results, baselines)],
+            ['queries'])
+
+    def test_command_rejects_non_positive_repeat(self):
+        """Число замеров меньше единицы отклоняется до наполнения базы."""
+        with mock.patch.object(runner, 'run') as run:
+            for repeat in (0, -1):
+                with self.subTest(repeat=repeat):
+                    with self.assertRaises(CommandError):
+                        call_command('benchmark', repeat=repeat)
+        run.assert_not_called()
@@ -0,0 +1,118 @@
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from ..cache_backends import sqlite
+from ..cache_backends.sqlite import SQLiteCache
+
+INCREMENTS_PER_PROCESS = 50
+
+
+def _increment(location):
+    cache = SQLiteCache(location, {})
+    for _ in range(INCREMENTS_PER_PROCESS):
+        cache.incr('counter')
+
+
+class SQLiteCacheTests(SimpleTestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.location = os.path.join(self.directory, 'cache.sqlite3')
+        self.cache = SQLiteCache(self.location, {})
+
+    def tearDown(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def test_set_get_delete(self):
+        """Базовые операции работают как у кешей Django."""
+        self.cache.set('key', {'value': [1, 2]})
+        self.assertEqual(self.cache.get('key'), {'value': [1, 2]})
+        self.assertTrue(self.cache.has_key('key'))
+        self.cache.delete('key')
+        self.assertIsNone(self.cache.get('key'))
+        self.assertEqual(self.cache.get('key', 'default'), 'default')
+
+    def test_many(self):
+        """get_many и set_many работают пачками."""
+        cache = SQLiteCache(self.location, {'OPTIONS': {'MAX_ENTRIES': 2000}})
+        data = {f'key{num}': num for num in range(1000)}
+        cache.set_many(data)
+        self.assertEqual(cache.get_many([*data, 'missing']), data)
+        cache.delete_many(data)
+        self.assertEqual(cache.get_many(data), {})
+
+    def test_expiration(self):
+        """Просроченные записи не отдаются, add их перезаписывает."""
+        self.cache.set('key', 'old', timeout=0)
+        self.assertIsNone(self.cache.get('key'))
+        self.assertTrue(self.cache.add('key', 'new'))
+        self.assertFalse(self.cache.add('key', 'newer'))
+        self.assertEqual(self.cache.get('key'), 'new')
+        self.assertTrue(self.cache.touch('key', timeout=None))
+        self.assertFalse(self.cache.touch('missing'))
+
+    def test_incr(self):
+        """incr меняет значение и падает на отсутствующем ключе."""
+        self.cache.set('counter', 1)
+        self.assertEqual(self.cache.incr('counter', 5), 6)
+        self.assertEqual(self.cache.decr('counter'), 5)
+        with self.assertRaises(ValueError):
+            self.cache.incr('missing')
+
+    def test_shared_between_processes(self):
+        """Процессы видят общий кеш, а incr между ними атомарен."""
+        self.cache.set('counter', 0)
+        context = multiprocessing.get_context('fork')
+        processes = [context.Process(target=_increment,
+                                     args=(self.location,))
+                     for _ in range(4)]
+        for process in processes:
+            process.start()
+        for process in processes:
+            process.join()
+        self.assertEqual(self.cache.get('counter'),
+                         4 * INCREMENTS_PER_PROCESS)
+
+    def test_cull_least_recently_used(self):
+        """При переполнении вытесняются давно не читанные записи."""
+        cache = SQLiteCache(
+            self.location, {'OPTIONS': {'MAX_ENTRIES': 10,
+                                        'CULL_FREQUENCY': 2,
+                                        'CULL_INTERVAL': 1}})
+        now = time.time()
+        with mock.patch.object(sqlite.time, 'time',
+                               return_value=now - 3600):
+            cache.set_many({f'key{num}': num for num in range(10)},
+                           timeout=None)
+        cache.get('key0')
+        cache.set('key10', 10)
+        self.assertEqual(cache.get('key0'), 0)
+        self.assertEqual(cache.get('key10'), 10)
+        self.assertLessEqual(len(cache.get_many(
+            [f'key{num}' for num in range(11)])), 10)
+
+    def test_cull_checked_once_per_interval(self):
+        """Переполнение проверяется не при каждой записи."""
+        cache = SQLiteCache(
+            self.location, {'OPTIONS': {'MAX_ENTRIES': 1,
+                                        'CULL_INTERVAL': 100}})
+        with mock.patch.object(sqlite.random, 'random', return_value=0.5):
+            cache.set_many({f'key{num}': num for num in range(5)})
+        self.assertEqual(len(cache.get_many(
+            [f'key{num}' for num in range(5)])), 5)
+        with mock.patch.object(sqlite.random, 'random', return_value=0):
+            cache.set('key5', 5)
+        self.assertLess(len(cache.get_many(
+            [f'key{num}' for num in range(6)])), 6)
+
+    def test_expired_entries_use_index(self):
+        """Удаление просроченных записей идёт по индексу."""
+        plan = self.cache._connection().execute(
+            'EXPLAIN QUERY PLAN DELETE FROM cache'
+            ' WHERE expires IS NOT NULL AND expires <= ?', (0,)).fetchall()
+        self.assertIn('cache_expires_idx', ' '.join(row[-1] for row in plan))
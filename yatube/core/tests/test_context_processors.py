@@ -0,0 +1,120 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+
+from posts.models import Group, Post
+from ..context_processors.menu_item import author_lists, group_lists
+from . import execute_on_commit
+
+User = get_user_model()
+
+
+# Фоновые задачи постов на меню не влияют, а их потоки не видят
+# незафиксированную транзакцию теста
+@mock.patch('posts.signals.run_in_background', mock.Mock())
+class MenuContextProcessorsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Group.objects.create(
+            title='Пустая группа',
+            slug='empty-slug',
+            description='Тестовое описание',
+        )
+        cls.author = User.objects.create_user(
+            username='author', first_name='Имя', last_name='Фамилия')
+        User.objects.bulk_create([
+            User(username=f'reader{num}') for num in range(20)
+        ])
+        Post.objects.create(
+            text='Тестовый пост',
+            group=cls.group,
+            author=cls.author,
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/')
+
+    def test_menu_contains_only_not_empty_items(self):
+        """В меню попадают только группы и авторы с постами."""
+        self.assertEqual(
+            [group['slug'] for group
+             in group_lists(self.request)['menu_group_lists']],
+            [MenuContextProcessorsTests.group.slug])
+        self.assertEqual(
+            author_lists(self.request)['menu_author_lists'],
+            [{'username': 'author', 'full_name': 'Имя Фамилия'}])
+
+    def test_menu_uses_single_query(self):
+        """Меню строится одним запросом и дальше берётся из кеша."""
+        for processor in (group_lists, author_lists):
+            with self.subTest(processor=processor.__name__):
+                with self.assertNumQueries(1):
+                    processor(self.request)
+                with self.assertNumQueries(0):
+                    processor(self.request)
+
+    def test_menu_invalidated_on_post_create(self):
+        """Новый пост сразу попадает в закешированное меню."""
+        version = group_lists(self.request)['menu_version']
+        new_author = User.objects.create_user(username='new_author')
+        new_group = Group.objects.create(
+            title='Новая группа',
+            slug='new-slug',
+            description='Тестовое описание',
+        )
+        with execute_on_commit():
+            Post.objects.create(
+                text='Новый пост', group=new_group, author=new_author)
+        context = group_lists(self.request)
+        self.assertNotEqual(context['menu_version'], version)
+        self.assertIn(new_group.slug,
+                      [group['slug'] for group in context['menu_group_lists']])
+        self.assertIn(new_author.username,
+                      [author['username'] for author
+                       in author_lists(self.request)['menu_author_lists']])
+
+    def test_menu_invalidated_after_counters_on_post_delete(self):
+        """Меню сбрасывается после обновления счётчиков при удалении
+        последнего поста автора и группы."""
+        author = User.objects.create_user(username='removed_author')
+        group = Group.objects.create(
+            title='Удаляемая группа',
+            slug='removed-slug',
+            description='Тестовое описание',
+        )
+        with execute_on_commit():
+            post = Post.objects.create(
+                text='Удаляемый пост', group=group, author=author)
+        version = group_lists(self.request)['menu_version']
+        with execute_on_commit():
+            post.delete()
+            # До фиксации транзакции версия меню не меняется
+            self.assertEqual(group_lists(self.request)['menu_version'],
+                             version)
+        self.assertNotIn(group.slug,
+                         [group['slug'] for group
+                          in group_lists(self.request)['menu_group_lists']])
+        self.assertNotIn(author.username,
+                         [author['username'] for author
+                          in author_lists(self.request)['menu_author_lists']])
+
+    def test_menu_invalidated_on_post_group_change(self):
+        """Перенос поста в пустую группу сразу попадает в меню."""
+        group_lists(self.request)
+        post = Post.objects.get(group=MenuContextProcessorsTests.group)
+        post.group = Group.objects.get(slug='empty-slug')
+        with execute_on_commit():
+            post.save()
+        self.assertEqual(
+            [group['slug'] for group
+             in group_lists(self.request)['menu_group_lists']],
+            ['empty-slug'])
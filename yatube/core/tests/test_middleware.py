@@ -0,0 +1,75 @@
+import json
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.tests import DISABLE_CACHING
+from .. import middleware
+
+User = get_user_model()
+
+
+@override_settings(**DISABLE_CACHING)
+@override_settings(REQUEST_LOG_SAMPLE_RATE=0)
+class RequestTimingMiddlewareTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.staff = User.objects.create_user(username='staff',
+                                             is_staff=True)
+        cls.reader = User.objects.create_user(username='reader')
+
+    def logged(self, url):
+        """Запрашивает url и возвращает записи лога core.requests."""
+        with mock.patch.object(middleware.logger, 'log') as log:
+            self.client.get(url)
+        return [(level, json.loads(message))
+                for (level, message), _ in log.call_args_list]
+
+    def test_server_timing_only_for_staff(self):
+        """Server-Timing получают сотрудники, остальные — нет."""
+        url = reverse('posts:index')
+        for user, expected in ((None, False), (self.reader, False),
+                               (self.staff, True)):
+            with self.subTest(user=user):
+                self.client.logout()
+                if user:
+                    self.client.force_login(user)
+                response = self.client.get(url)
+                self.assertIs(response.has_header('Server-Timing'),
+                              expected)
+        header = response['Server-Timing']
+        for metric in ('db;', 'view;', 'template;', 'menu;', 'total;'):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, header)
+
+    def test_sampled_request_is_logged(self):
+        """Попавший в выборку запрос пишет строку JSON с метриками."""
+        url = reverse('posts:index')
+        with override_settings(REQUEST_LOG_SAMPLE_RATE=1), \
+                CaptureQueriesContext(connection) as queries:
+            records = self.logged(url)
+        self.assertEqual(len(records), 1)
+        level, record = records[0]
+        self.assertEqual(level, middleware.logging.INFO)
+        self.assertEqual(record['view'], 'posts:index')
+        self.assertEqual(record['status'], 200)
+        self.assertEqual(record['db_queries'], len(queries))
+        self.assertFalse(record['slow'])
+        for field in ('total_ms', 'view_ms', 'db_ms', 'template_ms'):
+            with self.subTest(field=field):
+                self.assertGreaterEqual(record[field], 0)
+
+    def test_slow_threshold_per_view(self):
+        """Медленный запрос пишется всегда, порог — свой у
+        представления."""
+        with mock.patch.object(middleware, 'SLOW_REQUEST_MS', 0):
+            self.assertEqual(self.logged(reverse('posts:index'))[0][0],
+                             middleware.logging.WARNING)
+            with mock.patch.dict(middleware.SLOW_REQUEST_MS_BY_VIEW,
+                                 {'about:author': 10 ** 6}):
+                self.assertEqual(self.logged(reverse('about:author')), [])
@@ -0,0 +1,74 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.template.base import Template
+from django.templatetags.cache import CacheNode
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+from posts.tests import DISABLE_CACHING
+from ..template_profiler import CACHE, TEMPLATE, profile_templates
+
+User = get_user_model()
+
+ARTICLE = (TEMPLATE, 'posts/includes/article.html')
+INDEX = (TEMPLATE, 'posts/index.html')
+INDEX_PAGE = (CACHE, 'index_page')
+
+
+class TemplateProfilerTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        author = User.objects.create_user(username='author')
+        Post.objects.bulk_create([
+            Post(text=f'Пост {num}', author=author) for num in range(3)
+        ])
+
+    @override_settings(**DISABLE_CACHING)
+    def test_counts_templates_and_cache_misses(self):
+        """Карточка считается на каждый пост, промах кеша — при
+        рендеринге фрагмента."""
+        with profile_templates() as profile:
+            self.client.get(reverse('posts:index'))
+        self.assertEqual(profile.stats[ARTICLE].calls, 3)
+        self.assertEqual(profile.stats[INDEX_PAGE].calls, 1)
+        self.assertEqual(profile.stats[INDEX_PAGE].misses, 1)
+        index_page = profile.stats[INDEX_PAGE]
+        self.assertGreaterEqual(index_page.total,
+                                index_page.own + profile.stats[ARTICLE].total)
+        self.assertGreaterEqual(profile.stats[INDEX].total, index_page.total)
+
+    def test_restores_render(self):
+        """После блока рендеринг узлов возвращается к исходному."""
+        originals = Template.render, CacheNode.render
+        with profile_templates():
+            self.assertNotEqual(Template.render, originals[0])
+        self.assertEqual((Template.render, CacheNode.render), originals)
+
+    def test_command_reports_ranked_fragments(self):
+        """Команда выводит отчёт с фрагментами страницы."""
+        output = io.StringIO()
+        call_command('profile_templates', reverse('posts:index'),
+                     repeat=2, cold=True, stdout=output)
+        self.assertIn(' '.join(ARTICLE), output.getvalue())
+        self.assertIn(' '.join(INDEX_PAGE), output.getvalue())
+
+    def test_command_profiles_warm_anonymous_page(self):
+        """Без очистки кеша анонимная страница всё равно рендерится и
+        её фрагменты попадают в отчёт."""
+        output = io.StringIO()
+        call_command('profile_templates', reverse('posts:index'),
+                     repeat=2, stdout=output)
+        self.assertIn(' '.join(INDEX_PAGE), output.getvalue())
+        self.assertIn(' '.join(INDEX), output.getvalue())
+
+    def test_command_rejects_non_positive_repeat(self):
+        """Число замеров меньше единицы отклоняется командой."""
+        for repeat in (0, -1):
+            with self.subTest(repeat=repeat):
+                with self.assertRaises(CommandError):
+                    call_command('profile_templates', reverse('posts:index'),
+                                 repeat=repeat, stdout=io.StringIO())
@@ -1,9 +1,42 @@
 from django.contrib import admin
 
+from . import search
 from .models import Comment, Group, Post, Follow
+from .paginator import EstimatedCountPaginator
 from .settings import EMPTY_VALUE_DISPLAY
 
 
+class AuthorUsernameFilter(admin.SimpleListFilter):
+    """
+    Фильтр по имени пользователя автора.
+
+    Стандартный фильтр по внешнему ключу выводит ссылку на каждого
+    пользователя, здесь же вместо списка одно поле ввода.
+    """
+    title = 'автору'
+    parameter_name = 'author__username'
+    placeholder = 'Имя пользователя'
+    template = 'admin/input_filter.html'
+
+    def lookups(self, request, model_admin):
+        # Непустой список нужен, чтобы админка показала фильтр
+        return ((self.value(), self.value()),)
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(author__username=self.value())
+        return queryset
+
+    def choices(self, changelist):
+        yield {
+            'value': self.value() or '',
+            'hidden_params': [
+                (name, value) for name, value in changelist.params.items()
+                if name != self.parameter_name
+            ],
+        }
+
+
 @admin.register(Post)
 class PostAdmin(admin.ModelAdmin):
     list_display = (
@@ -15,10 +48,33 @@ class PostAdmin(admin.ModelAdmin):
         'group',
     )
     list_editable = ('group',)
+    list_select_related = ('author', 'group',)
     search_fields = ('title', 'text',)
-    list_filter = ('pub_date', 'author', 'group',)
+    list_filter = ('pub_date', AuthorUsernameFilter, 'group',)
+    autocomplete_fields = ('author',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_VALUE_DISPLAY
 
+    def get_search_results(self, request, queryset, search_term):
+        # Поиск идёт по полнотекстовому индексу, а не LIKE по search_fields
+        if not search_term:
+            return queryset, False
+        return search.matching(queryset, search_term), False
+
+    def formfield_for_foreignkey(self, db_field, request, **kwargs):
+        formfield = super().formfield_for_foreignkey(db_field, request,
+                                                     **kwargs)
+        if db_field.name == 'group' and request is not None:
+            # Список групп выбирается один раз на запрос, а не для каждой
+            # строки с list_editable
+            choices = getattr(request, '_post_group_choices', None)
+            if choices is None:
+                choices = list(formfield.choices)
+                request._post_group_choices = choices
+            formfield.choices = choices
+        return formfield
+
 
 @admin.register(Group)
 class GroupAdmin(admin.ModelAdmin):
@@ -30,11 +86,20 @@ class GroupAdmin(admin.ModelAdmin):
 @admin.register(Comment)
 class CommentAdmin(admin.ModelAdmin):
     list_display = ('pk', 'text', 'created', 'author',)
+    list_select_related = ('author',)
     search_fields = ('text', )
+    autocomplete_fields = ('author',)
+    raw_id_fields = ('post',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     empty_value_display = EMPTY_VALUE_DISPLAY
 
 
 @admin.register(Follow)
-class CommentAdmin(admin.ModelAdmin):
+class FollowAdmin(admin.ModelAdmin):
     list_display = ('user', 'author',)
-    search_fields = ('user', 'author',)
+    list_select_related = ('user', 'author',)
+    search_fields = ('user__username', 'author__username',)
+    autocomplete_fields = ('user', 'author',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,12 @@
+from itertools import islice
+from typing import Iterable, Iterator
+
+
+def batches(iterable: Iterable, size: int) -> Iterator[list]:
+    """Разбивает итерируемый объект на списки не длиннее size."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
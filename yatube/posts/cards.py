@@ -0,0 +1,89 @@
+"""
+Кеш отрисованных карточек постов.
+
+Карточка (posts/includes/article.html) одинакова для всех посетителей и
+во всех лентах с тем же вариантом, то есть набором ссылок на группу и
+автора. Единственная часть, зависящая от посетителя, — ссылка
+«Редактировать»: вместо неё в карточку выводится метка, которую
+{% post_actions %} заменяет уже после кеша. Поэтому и фрагменты лент
+кешируются без учёта пользователя.
+
+Ключ карточки включает updated_at поста и общее поколение лент, которое
+меняется при переименовании групп и авторов, так что сбрасывать записи
+не нужно. Карточки страницы читаются из кеша одним get_many.
+"""
+import re
+from typing import Callable, Iterable
+
+from django.core.cache import cache
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core.cache_versions import get_version
+
+from .generations import FEEDS
+from .models import Post
+from .settings import CARD_CACHE_TIMEOUT
+
+CARD_TEMPLATE = 'posts/includes/article.html'
+ACTIONS_TEMPLATE = 'posts/includes/article_actions.html'
+ACTIONS_MARKER = re.compile(r'<!--post-actions:(\d+):(\d+)-->')
+
+# Ленты, где ссылка на группу или автора повторяла бы заголовок страницы
+NO_GROUP_LINK_VIEWS = {'posts:group_list'}
+NO_AUTHOR_LINK_VIEWS = {'posts:profile'}
+
+
+def variant(view_name: str) -> dict:
+    """Флаги вида карточки для представления view_name."""
+    return {
+        'show_group': view_name not in NO_GROUP_LINK_VIEWS,
+        'show_author': view_name not in NO_AUTHOR_LINK_VIEWS,
+    }
+
+
+def card_key(post: Post, feeds_version: int, flags: dict) -> str:
+    version = int(post.updated_at.timestamp() * 1000000)
+    variant_code = ''.join(str(int(flags[name])) for name in sorted(flags))
+    return f'card:{post.pk}:{version}:{feeds_version}:{variant_code}'
+
+
+def render_cards(posts: Iterable[Post], render: Callable[[Post], str],
+                 flags: dict) -> str:
+    """
+    Возвращает карточки постов, отрисовывая только отсутствующие в кеше.
+
+    Args:
+        posts: Посты в порядке вывода
+        render: Отрисовывает карточку одного поста
+        flags: Вариант карточки из variant()
+    Returns:
+        HTML карточек подряд
+    """
+    feeds_version = get_version(FEEDS)
+    keys = {card_key(post, feeds_version, flags): post for post in posts}
+    cards = cache.get_many(keys)
+    missing = {key: render(post)
+               for key, post in keys.items() if key not in cards}
+    if missing:
+        cache.set_many(missing, CARD_CACHE_TIMEOUT)
+        cards.update(missing)
+    return ''.join(cards[key] for key in keys)
+
+
+def action_marker(post: Post) -> str:
+    """Метка места для ссылок посетителя в карточке."""
+    return mark_safe(f'<!--post-actions:{post.pk}:{post.author_id}-->')
+
+
+def render_actions(html: str, user) -> str:
+    """Заменяет метки карточек ссылками, доступными пользователю."""
+    user_id = user.pk if user is not None and user.is_authenticated else None
+
+    def replace(match):
+        post_id, author_id = map(int, match.groups())
+        if author_id != user_id:
+            return ''
+        return render_to_string(ACTIONS_TEMPLATE, {'post_id': post_id})
+
+    return ACTIONS_MARKER.sub(replace, html)
@@ -0,0 +1,39 @@
+"""
+Баннер главной страницы из последних постов с изображениями.
+
+Список хранится в общем кеше и пересобирается при создании,
+редактировании и удалении постов, которые в него попадают или уже в нём
+находятся.
+"""
+from django.core.cache import cache
+
+from .models import Post
+from .settings import CAROUSEL_CACHE_TIMEOUT, CAROUSEL_SIZE
+
+CAROUSEL_CACHE_KEY = 'posts:carousel'
+
+
+def refresh() -> list:
+    """Выбирает посты для баннера по индексу (has_image, pub_date)."""
+    posts = list(Post.objects
+                 .filter(has_image=True)
+                 .order_by('-pub_date')[:CAROUSEL_SIZE])
+    cache.set(CAROUSEL_CACHE_KEY, posts, CAROUSEL_CACHE_TIMEOUT)
+    return posts
+
+
+def get_posts() -> list:
+    """Возвращает посты для баннера."""
+    posts = cache.get(CAROUSEL_CACHE_KEY)
+    if posts is None:
+        posts = refresh()
+    return posts
+
+
+def refresh_if_affected(post: Post) -> None:
+    """Пересобирает баннер, если изменение поста может на нём сказаться."""
+    cached = cache.get(CAROUSEL_CACHE_KEY)
+    if cached is None:
+        return
+    if post.has_image or post.pk in {item.pk for item in cached}:
+        refresh()
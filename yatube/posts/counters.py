@@ -0,0 +1,122 @@
+"""
+Денормализованные счётчики.
+
+Счётчики меняются атомарно выражениями F() при создании, редактировании
+и удалении постов, комментариев и подписок. rebuild_* пересчитывают их
+по фактическим данным и используются командой rebuild_counters.
+
+Меню строится по счётчикам публикаций, поэтому сбрасывается после
+каждого их изменения.
+"""
+from django.db.models import (DEFERRED, Count, F, IntegerField, OuterRef,
+                              Subquery)
+from django.db.models.functions import Coalesce, Greatest
+
+from core.context_processors.menu_item import invalidate_menu
+
+from .bulk import batches
+from .models import AuthorStats, Comment, Follow, Group, Post, User
+from .settings import COUNTERS_BATCH_SIZE
+
+
+def _count_subquery(queryset, field: str) -> Coalesce:
+    counts = (queryset
+              .filter(**{field: OuterRef('pk')})
+              .order_by()
+              .values(field)
+              .annotate(count=Count('pk'))
+              .values('count'))
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def _actual_author_stats(user_id: int) -> dict:
+    return {
+        'posts_count': Post.objects.filter(author_id=user_id).count(),
+        'followers_count': Follow.objects.filter(author_id=user_id).count(),
+    }
+
+
+def change_author_stats(user_id: int, **deltas: int) -> None:
+    """
+    Атомарно изменяет счётчики автора на заданные величины.
+
+    Если строки счётчиков ещё нет, при увеличении она создаётся
+    с фактическими значениями. При уменьшении отсутствующая строка
+    не создаётся: так бывает при каскадном удалении пользователя.
+    """
+    updates = {field: Greatest(F(field) + delta, 0)
+               for field, delta in deltas.items()}
+    updated = AuthorStats.objects.filter(user_id=user_id).update(**updates)
+    if not updated and any(delta > 0 for delta in deltas.values()):
+        AuthorStats.objects.get_or_create(
+            user_id=user_id, defaults=_actual_author_stats(user_id))
+    if 'posts_count' in deltas:
+        invalidate_menu()
+
+
+def rebuild_author_stats() -> None:
+    """Пересчитывает счётчики всех авторов."""
+    user_ids = User.objects.values_list('pk', flat=True).iterator()
+    for batch in batches(user_ids, COUNTERS_BATCH_SIZE):
+        AuthorStats.objects.bulk_create(
+            [AuthorStats(user_id=user_id) for user_id in batch],
+            ignore_conflicts=True,
+        )
+    AuthorStats.objects.update(
+        posts_count=_count_subquery(Post.objects.all(), 'author'),
+        followers_count=_count_subquery(Follow.objects.all(), 'author'),
+    )
+    invalidate_menu()
+
+
+def change_group_posts_count(group_id: int, delta: int) -> None:
+    """Атомарно изменяет счётчик публикаций группы."""
+    if group_id is None:
+        return
+    Group.objects.filter(pk=group_id).update(
+        posts_count=Greatest(F('posts_count') + delta, 0))
+    invalidate_menu()
+
+
+def move_post_between_groups(post: Post, created: bool) -> None:
+    """
+    Обновляет счётчики групп после сохранения поста.
+
+    Прежняя группа берётся из значения, загруженного из базы
+    (Post.from_db). Если пост сохранён без загрузки, текущая группа
+    пересчитывается по фактическим данным.
+    """
+    old_group_id = (None if created
+                    else getattr(post, '_loaded_group_id', DEFERRED))
+    if old_group_id is DEFERRED:
+        rebuild_group_posts_count(Group.objects.filter(pk=post.group_id))
+    elif old_group_id != post.group_id:
+        change_group_posts_count(old_group_id, -1)
+        change_group_posts_count(post.group_id, 1)
+
+
+def rebuild_group_posts_count(groups=None) -> None:
+    """Пересчитывает счётчики публикаций групп, по умолчанию всех."""
+    if groups is None:
+        groups = Group.objects.all()
+    groups.update(posts_count=_count_subquery(Post.objects.all(), 'group'))
+    invalidate_menu()
+
+
+def change_post_comments_count(post_id: int, delta: int) -> None:
+    """Атомарно изменяет счётчик комментариев поста."""
+    Post.objects.filter(pk=post_id).update(
+        comments_count=Greatest(F('comments_count') + delta, 0))
+
+
+def rebuild_post_comments_count() -> None:
+    """Пересчитывает счётчики комментариев всех постов."""
+    Post.objects.update(
+        comments_count=_count_subquery(Comment.objects.all(), 'post'))
+
+
+def rebuild_all() -> None:
+    """Пересчитывает все денормализованные счётчики."""
+    rebuild_author_stats()
+    rebuild_group_posts_count()
+    rebuild_post_comments_count()
@@ -0,0 +1,36 @@
+"""
+Отметки постов, которые удаляются прямо сейчас.
+
+Комментарии удаляются каскадом раньше самого поста, а счётчик
+комментариев и страница поста уходят вместе с ним, поэтому обработчики
+комментариев пропускают отмеченные посты. Отметки ставятся и снимаются
+сигналами удаления поста. Если удаление прервётся ошибкой, post_delete не
+придёт, поэтому удаления постов идут внутри deleting(): блок возвращает
+отметки к прежнему состоянию при любом исходе.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+_deleting_posts = ContextVar('deleting_posts', default=frozenset())
+
+
+def mark(post_id: int) -> None:
+    _deleting_posts.set(_deleting_posts.get() | {post_id})
+
+
+def unmark(post_id: int) -> None:
+    _deleting_posts.set(_deleting_posts.get() - {post_id})
+
+
+def is_deleting(post_id: int) -> bool:
+    return post_id in _deleting_posts.get()
+
+
+@contextmanager
+def deleting():
+    """Снимает отметки, поставленные внутри блока, при выходе из него."""
+    token = _deleting_posts.set(_deleting_posts.get())
+    try:
+        yield
+    finally:
+        _deleting_posts.reset(token)
@@ -0,0 +1,58 @@
+"""
+Построение querysets для лент постов.
+
+Все ленты выбирают автора и группу тем же запросом и загружают только
+поля, которые нужны карточке поста (posts/includes/article.html) и ключу
+её кеша (posts/cards.py), поэтому страница ленты стоит фиксированное
+число запросов вне зависимости от количества постов на ней.
+"""
+from django.db.models import QuerySet
+
+from .models import Post
+
+FEED_POST_FIELDS = (
+    'title',
+    'text',
+    'pub_date',
+    'image',
+    'has_image',
+    'updated_at',
+    'author',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group',
+    'group__title',
+    'group__slug',
+)
+
+
+def post_feed(queryset: QuerySet = None) -> QuerySet:
+    """
+    Готовит queryset постов для вывода в ленте.
+
+    Args:
+        queryset: Посты ленты, по умолчанию все посты
+    Returns:
+        Queryset с подгруженными автором и группой
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    return (queryset
+            .select_related('author', 'group')
+            .only(*FEED_POST_FIELDS))
+
+
+def timeline_feed(queryset: QuerySet) -> QuerySet:
+    """
+    Готовит queryset записей ленты подписок с подгруженными постами.
+
+    Args:
+        queryset: Записи ленты пользователя
+    Returns:
+        Queryset записей ленты с постами, авторами и группами
+    """
+    post_fields = (f'post__{field}' for field in FEED_POST_FIELDS)
+    return (queryset
+            .select_related('post__author', 'post__group')
+            .only('user', 'pub_date', 'post', *post_fields))
@@ -0,0 +1,96 @@
+"""
+Поколения кешей лент.
+
+Фрагменты лент кешируются с ключом, включающим номер поколения ленты.
+Запись увеличивает поколения только затронутых лент, поэтому кеш может
+жить долго и при этом не отдаёт устаревшие данные после изменений.
+Поколения увеличиваются после фиксации транзакции: до неё параллельный
+запрос ещё видит старые данные и закешировал бы их под новым поколением.
+"""
+from django.db import transaction
+
+from core.cache_versions import bump_version, get_versions
+
+from .models import Group, Post, User
+
+FEEDS = 'feeds'
+INDEX_FEED = 'feed:index'
+
+
+def group_feed(group_id: int) -> str:
+    return f'feed:group:{group_id}'
+
+
+def author_feed(author_id: int) -> str:
+    return f'feed:author:{author_id}'
+
+
+def post_page(post_id: int) -> str:
+    return f'post:{post_id}'
+
+
+def feed_generation(name: str) -> str:
+    """
+    Возвращает поколение ленты для ключа кеша.
+
+    Поколение складывается из общего поколения всех лент, которое
+    меняется при переименовании групп и авторов, и поколения самой ленты.
+    """
+    versions = get_versions(FEEDS, name)
+    return f'{versions[FEEDS]}.{versions[name]}'
+
+
+def _bump_on_commit(*names: str) -> None:
+    transaction.on_commit(lambda: bump_version(*names))
+
+
+def bump_post_feeds(post: Post) -> None:
+    """Сбрасывает ленты, в которых показывается пост."""
+    names = {INDEX_FEED, author_feed(post.author_id), post_page(post.pk)}
+    for group_id in (post.group_id, getattr(post, '_loaded_group_id', None)):
+        if isinstance(group_id, int):
+            names.add(group_feed(group_id))
+    _bump_on_commit(*names)
+
+
+def bump_all_feeds() -> None:
+    """Сбрасывает все ленты разом."""
+    _bump_on_commit(FEEDS)
+
+
+def bump_post_page(post_id: int) -> None:
+    """Сбрасывает страницу поста, например после нового комментария."""
+    _bump_on_commit(post_page(post_id))
+
+
+def _first_value(queryset):
+    return next(iter(queryset.order_by()[:1]), None)
+
+
+# Версии, от которых зависят страницы. Функции получают аргументы
+# представления и возвращают None, если объекта нет и кешировать нечего.
+
+def index_scopes(request):
+    return FEEDS, INDEX_FEED
+
+
+def group_scopes(request, slug):
+    group_id = _first_value(
+        Group.objects.filter(slug=slug).values_list('pk', flat=True))
+    if group_id is not None:
+        return FEEDS, group_feed(group_id)
+
+
+def profile_scopes(request, username):
+    author_id = _first_value(
+        User.objects.filter(username=username).values_list('pk', flat=True))
+    if author_id is not None:
+        return FEEDS, author_feed(author_id)
+
+
+def post_scopes(request, post_id):
+    # На странице поста выводится число постов автора
+    author_id = _first_value(
+        Post.objects.filter(pk=post_id).values_list('author_id', flat=True))
+    if author_id is not None:
+        return FEEDS, post_page(post_id), author_feed(author_id)
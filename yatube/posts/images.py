@@ -0,0 +1,127 @@
+"""
+Нормализация загруженных изображений постов.
+
+Выполняется в фоне после сохранения поста: исходник уменьшается до
+IMAGE_MAX_SIZE, поворачивается по EXIF и перекодируется в WebP (или
+JPEG, если Pillow собран без WebP) без метаданных. После этого
+создаются миниатюры уже из нормализованного файла. Фоновая очередь не
+переживает перезапуск, поэтому пропущенные изображения нормализует
+команда generate_thumbnails.
+"""
+import logging
+import os
+from io import BytesIO
+from typing import Optional
+
+from django.core.files.base import ContentFile
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from . import carousel, generations, thumbnails
+from .models import Post
+from .settings import IMAGE_MAX_SIZE, IMAGE_QUALITY, KEEP_ORIGINAL_IMAGES
+
+logger = logging.getLogger(__name__)
+
+EXTENSIONS = {'WEBP': '.webp', 'JPEG': '.jpg', 'PNG': '.png'}
+
+
+def _target_format(image: Image.Image) -> str:
+    if features.check('webp'):
+        return 'WEBP'
+    # Без WebP прозрачность сохраняет только PNG
+    if image.mode in ('RGBA', 'LA') or 'transparency' in image.info:
+        return 'PNG'
+    return 'JPEG'
+
+
+def _needs_normalization(image: Image.Image, target: str) -> bool:
+    return (image.format != target
+            or image.width > IMAGE_MAX_SIZE[0]
+            or image.height > IMAGE_MAX_SIZE[1]
+            or bool(image.getexif()))
+
+
+def normalize(field_file) -> Optional[ContentFile]:
+    """
+    Возвращает нормализованное изображение или None, если менять нечего.
+
+    Анимированные изображения не трогаются: при перекодировании они
+    потеряли бы анимацию.
+    """
+    with field_file.open('rb') as file:
+        image = Image.open(file)
+        if getattr(image, 'is_animated', False):
+            return None
+        target = _target_format(image)
+        if not _needs_normalization(image, target):
+            return None
+        # Для JPEG декодируется сразу уменьшенная копия
+        image.draft('RGB', IMAGE_MAX_SIZE)
+        image = ImageOps.exif_transpose(image)
+        image.thumbnail(IMAGE_MAX_SIZE, Image.LANCZOS)
+        if target == 'JPEG' and image.mode != 'RGB':
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        output = BytesIO()
+        # exif не передаётся, поэтому метаданные не сохраняются
+        image.save(output, target, quality=IMAGE_QUALITY, optimize=True)
+    stem = os.path.splitext(os.path.basename(field_file.name))[0]
+    return ContentFile(output.getvalue(), name=stem + EXTENSIONS[target])
+
+
+def normalize_post_image(post: Post) -> bool:
+    """
+    Заменяет изображение поста нормализованным.
+
+    Поле обновляется запросом только если изображение не успели сменить,
+    пока шла обработка. Кеши страниц сбрасываются до удаления исходника,
+    чтобы они не ссылались на удалённый файл. Возвращает True, если
+    изображение заменено.
+    """
+    original = post.image.name
+    normalized = normalize(post.image)
+    if normalized is None:
+        return False
+    field = post.image.field
+    name = field.storage.save(field.generate_filename(post, normalized.name),
+                              normalized)
+    updated = Post.objects.filter(pk=post.pk, image=original).update(
+        image=name, updated_at=timezone.now())
+    if not updated:
+        field.storage.delete(name)
+        return False
+    generations.bump_post_feeds(post)
+    if not KEEP_ORIGINAL_IMAGES:
+        field.storage.delete(original)
+    post.image = name
+    post._loaded_image = name
+    return True
+
+
+def normalize_post(post_id: int) -> bool:
+    """
+    Нормализует изображение поста, если это ещё не сделано.
+
+    Ошибки чтения файла записываются в лог. Возвращает True, если
+    изображение заменено.
+    """
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return False
+    try:
+        normalized = normalize_post_image(post)
+    except (OSError, Image.DecompressionBombError):
+        logger.exception('Не удалось нормализовать изображение поста %s',
+                         post_id)
+        return False
+    if normalized:
+        carousel.refresh_if_affected(post)
+    return normalized
+
+
+def process_post_image(post_id: int) -> None:
+    """Фоновая задача: нормализация изображения и создание миниатюр."""
+    normalize_post(post_id)
+    thumbnails.generate_for_post(post_id)
@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+
+
+class Command(BaseCommand):
+    help = 'Выгружает группы, посты, комментарии и подписки в JSONL'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '-o', '--output',
+            help='Файл для выгрузки; по умолчанию стандартный вывод',
+        )
+
+    def handle(self, *args, output, **options):
+        if output:
+            with open(output, 'w', encoding='utf-8') as stream:
+                exported = transfer.export(stream)
+        else:
+            exported = transfer.export(self.stdout)
+        summary = ', '.join(f'{model}: {count}'
+                            for model, count in exported.items())
+        # Сводка не должна попасть в сам JSONL при выводе в stdout
+        self.stderr.write(f'Выгружено {summary}')
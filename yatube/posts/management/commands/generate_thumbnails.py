@@ -0,0 +1,56 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from posts import generations, images, thumbnails
+from posts.models import Post
+
+
+def _normalize(post_id):
+    return images.normalize_post(post_id)
+
+
+def _generate(image_name):
+    thumbnails.generate(image_name)
+
+
+class Command(BaseCommand):
+    help = ('Нормализует изображения постов, пропущенные фоновой '
+            'обработкой, и создаёт миниатюры всех изображений в '
+            'нескольких процессах')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--workers', type=int, default=os.cpu_count(),
+            help='Число процессов; 1 — выполнить в текущем процессе',
+        )
+
+    def handle(self, *args, workers, **options):
+        post_ids = list(Post.objects
+                        .filter(has_image=True)
+                        .order_by()
+                        .values_list('pk', flat=True))
+        normalized = sum(self._map(_normalize, post_ids, workers))
+        # Нормализация меняет имена файлов, поэтому они читаются после неё
+        image_names = list(Post.objects
+                           .filter(has_image=True)
+                           .order_by()
+                           .values_list('image', flat=True)
+                           .distinct())
+        for _ in self._map(_generate, image_names, workers):
+            pass
+        generations.bump_all_feeds()
+        self.stdout.write(self.style.SUCCESS(
+            f'Нормализовано {normalized} изображений, миниатюры созданы '
+            f'для {len(image_names)} изображений'))
+
+    @staticmethod
+    def _map(func, items, workers):
+        if workers <= 1:
+            return [func(item) for item in items]
+        # Дочерние процессы не должны наследовать открытые соединения
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(func, items, chunksize=8))
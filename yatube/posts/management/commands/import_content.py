@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from posts import transfer
+from posts.settings import TRANSFER_BATCH_SIZE
+
+
+class Command(BaseCommand):
+    help = 'Загружает контент, выгруженный командой export_content'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл JSONL')
+        parser.add_argument(
+            '--batch-size', type=int, default=TRANSFER_BATCH_SIZE,
+            help='Число объектов в одной транзакции',
+        )
+
+    def handle(self, *args, path, batch_size, **options):
+        with open(path, encoding='utf-8') as stream:
+            imported = transfer.import_(stream, batch_size)
+        summary = ', '.join(f'{model}: {count}'
+                            for model, count in imported.items())
+        self.stdout.write(self.style.SUCCESS(f'Загружено {summary}'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import counters
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает денормализованные счётчики по фактическим данным'
+
+    def handle(self, *args, **options):
+        counters.rebuild_all()
+        self.stdout.write(self.style.SUCCESS('Счётчики пересчитаны'))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from posts import timeline
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает материализованные ленты подписок'
+
+    def handle(self, *args, **options):
+        timeline.rebuild()
+        self.stdout.write(self.style.SUCCESS('Ленты подписок перестроены'))
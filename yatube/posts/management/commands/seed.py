@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from posts import seed
+from posts.settings import SEED_BATCH_SIZE, SEED_PASSWORD
+
+
+class Command(BaseCommand):
+    help = ('Наполняет базу синтетическими данными для замеров. '
+            f'Пароль всех созданных пользователей — {SEED_PASSWORD}')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--follows', type=int, default=20000)
+        parser.add_argument('--comments', type=int, default=30000)
+        parser.add_argument(
+            '--image-share', type=float, default=0.2,
+            help='Доля постов с изображением, от 0 до 1',
+        )
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Зерно генератора: одинаковое зерно даёт одинаковые данные',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=SEED_BATCH_SIZE,
+            help='Число строк в одной транзакции',
+        )
+        parser.add_argument(
+            '--skip-timelines', action='store_true',
+            help='Не перестраивать ленты подписок',
+        )
+
+    def handle(self, *args, skip_timelines, **options):
+        def progress(kind, count):
+            self.stdout.write(f'{kind}: {count}')
+
+        try:
+            created = seed.seed(
+                options['users'], options['groups'], options['posts'],
+                options['follows'], options['comments'],
+                image_share=options['image_share'], seed=options['seed'],
+                batch_size=options['batch_size'],
+                timelines=not skip_timelines, progress=progress,
+            )
+        except ValueError as error:
+            raise CommandError(error)
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано объектов: {sum(created.values())}'))
@@ -0,0 +1,31 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:56
+
+from django.db import migrations, models
+
+
+def fill_has_image(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    (Post.objects
+     .exclude(image__isnull=True)
+     .exclude(image='')
+     .update(has_image=True))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_timelineentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='has_image',
+            field=models.BooleanField(default=False, editable=False, verbose_name='Есть изображение'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['has_image', '-pub_date'], name='post_has_image_pub_date_idx'),
+        ),
+        migrations.RunPython(fill_has_image, migrations.RunPython.noop),
+    ]
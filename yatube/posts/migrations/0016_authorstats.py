@@ -0,0 +1,54 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:58
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_author_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    Post = apps.get_model('posts', 'Post')
+    Follow = apps.get_model('posts', 'Follow')
+    AuthorStats = apps.get_model('posts', 'AuthorStats')
+
+    def count(model):
+        counts = (model.objects
+                  .filter(author=OuterRef('pk'))
+                  .order_by()
+                  .values('author')
+                  .annotate(count=Count('pk'))
+                  .values('count'))
+        return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+    AuthorStats.objects.bulk_create(
+        [AuthorStats(user_id=user_id)
+         for user_id in User.objects.values_list('pk', flat=True)],
+    )
+    AuthorStats.objects.update(posts_count=count(Post),
+                               followers_count=count(Follow))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0015_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='Количество публикаций')),
+                ('followers_count', models.PositiveIntegerField(default=0, verbose_name='Количество подписчиков')),
+            ],
+            options={
+                'verbose_name': 'Статистику автора',
+                'verbose_name_plural': 'Статистика авторов',
+            },
+        ),
+        migrations.RunPython(fill_author_stats, migrations.RunPython.noop),
+    ]
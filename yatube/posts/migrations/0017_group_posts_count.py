@@ -0,0 +1,35 @@
+# Generated by Django 2.2.16 on 2026-10-18 17:59
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def fill_group_posts_count(apps, schema_editor):
+    Group = apps.get_model('posts', 'Group')
+    Post = apps.get_model('posts', 'Post')
+    counts = (Post.objects
+              .filter(group=OuterRef('pk'))
+              .order_by()
+              .values('group')
+              .annotate(count=Count('pk'))
+              .values('count'))
+    Group.objects.update(posts_count=Coalesce(
+        Subquery(counts, output_field=IntegerField()), 0))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_authorstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False, verbose_name='Количество публикаций'),
+        ),
+        migrations.RunPython(fill_group_posts_count,
+                             migrations.RunPython.noop),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-18 18:00
+
+from django.db import migrations
+
+SEARCH_TABLE = 'posts_post_search'
+
+
+def create_search_index(apps, schema_editor):
+    # Полнотекстовый индекс есть только у SQLite, на других базах поиск
+    # работает через icontains
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5('
+        f"title, text, tokenize='unicode61 remove_diacritics 2')")
+    schema_editor.execute(
+        f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+        f"SELECT id, COALESCE(title, ''), text FROM posts_post")
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {SEARCH_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0018_post_comments_count'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
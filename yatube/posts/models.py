@@ -1,10 +1,37 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.utils import timezone
+
+from . import deletion
 
 User = get_user_model()
 
 
-class Group(models.Model):
+class CounterFieldsMixin:
+    """
+    Не перезаписывает денормализованные счётчики при сохранении объекта.
+
+    Счётчики меняются только атомарными UPDATE, а значение в загруженном
+    объекте может устареть к моменту его сохранения.
+    """
+    counter_fields = ()
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding and kwargs.get('update_fields') is None:
+            deferred = self.get_deferred_fields()
+            # Поля auto_now заполняются при сохранении, даже если не были
+            # загружены
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+                and (field.attname not in deferred
+                     or getattr(field, 'auto_now', False))
+            ]
+        super().save(*args, **kwargs)
+
+
+class Group(CounterFieldsMixin, models.Model):
     title = models.CharField(
         'Название',
         max_length=200,
@@ -16,6 +43,13 @@ class Group(models.Model):
     description = models.TextField(
         'Описание',
     )
+    posts_count = models.PositiveIntegerField(
+        'Количество публикаций',
+        default=0,
+        editable=False,
+    )
+
+    counter_fields = ('posts_count',)
 
     class Meta:
         verbose_name = 'Группу'
@@ -25,7 +59,13 @@ class Group(models.Model):
         return self.title
 
 
-class Post(models.Model):
+class PostQuerySet(models.QuerySet):
+    def delete(self):
+        with deletion.deleting():
+            return super().delete()
+
+
+class Post(CounterFieldsMixin, models.Model):
     title = models.CharField(
         'Заголовок поста',
         max_length=500,
@@ -35,15 +75,18 @@ class Post(models.Model):
         'Текст поста',
         help_text='Введите текст поста',
     )
+    # Не auto_now_add, чтобы bulk_create при импорте сохранял исходную дату
     pub_date = models.DateTimeField(
         'Дата публикации',
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
     )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='posts',
         verbose_name='Автор',
+        db_index=False,
     )
     group = models.ForeignKey(
         Group,
@@ -51,6 +94,7 @@ class Post(models.Model):
         related_name='groups',
         blank=True,
         null=True,
+        db_index=False,
         verbose_name='Группа',
         help_text='Выберите группу',
     )
@@ -61,21 +105,89 @@ class Post(models.Model):
         blank=True,
         help_text='Выберите изображение',
     )
+    has_image = models.BooleanField(
+        'Есть изображение',
+        default=False,
+        editable=False,
+    )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    # Версия карточки поста: меняется при любом сохранении, а также при
+    # обновлениях мимо save, которые меняют вид карточки
+    updated_at = models.DateTimeField(
+        'Дата изменения',
+        auto_now=True,
+    )
+
+    counter_fields = ('comments_count',)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = [
+            models.Index(
+                name='post_pub_date_idx',
+                fields=('-pub_date', '-id',),
+            ),
+            models.Index(
+                name='post_author_pub_date_idx',
+                fields=('author', '-pub_date', '-id',),
+            ),
+            models.Index(
+                name='post_group_pub_date_idx',
+                fields=('group', '-pub_date', '-id',),
+            ),
+            models.Index(
+                name='post_has_image_pub_date_idx',
+                fields=('has_image', '-pub_date',),
+            ),
+        ]
         verbose_name = 'Публикацию'
         verbose_name_plural = 'Публикации'
 
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Группа на момент загрузки нужна для пересчёта Group.posts_count
+        instance._loaded_group_id = instance.__dict__.get('group_id',
+                                                          models.DEFERRED)
+        # Имя файла на момент загрузки нужно, чтобы заметить новое
+        # изображение и подготовить для него миниатюры
+        instance._loaded_image = instance.__dict__.get('image',
+                                                       models.DEFERRED)
+        return instance
+
+    def save(self, *args, **kwargs):
+        self.has_image = bool(self.image)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = {*update_fields, 'updated_at'}
+            if 'image' in update_fields:
+                update_fields.add('has_image')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+        # Обработчики post_save уже отработали с прежними значениями
+        self._loaded_group_id = self.group_id
+        self._loaded_image = self.image.name
+
+    def delete(self, *args, **kwargs):
+        with deletion.deleting():
+            return super().delete(*args, **kwargs)
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
         Post,
         on_delete=models.CASCADE,
         related_name='comments',
+        db_index=False,
     )
     author = models.ForeignKey(
         User,
@@ -89,11 +201,18 @@ class Comment(models.Model):
     )
     created = models.DateTimeField(
         'Дата комментария',
-        auto_now_add=True,
+        default=timezone.now,
+        editable=False,
     )
 
     class Meta:
         ordering = ('-created',)
+        indexes = [
+            models.Index(
+                name='comment_post_created_idx',
+                fields=('post', '-created', '-id',),
+            ),
+        ]
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
 
@@ -106,11 +225,13 @@ class Follow(models.Model):
         User,
         on_delete=models.CASCADE,
         related_name='follower',
+        db_index=False,
     )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
         related_name='following',
+        db_index=False,
     )
 
     class Meta:
@@ -124,8 +245,77 @@ class Follow(models.Model):
                 check=~models.Q(user=models.F('author')),
             ),
         ]
+        indexes = [
+            models.Index(
+                name='follow_author_user_idx',
+                fields=('author', 'user',),
+            ),
+        ]
         verbose_name = 'Подписку'
         verbose_name_plural = 'Подписки'
 
     def __str__(self):
         return f'{self.user} -> {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        db_index=False,
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+    )
+    pub_date = models.DateTimeField(
+        'Дата публикации',
+    )
+
+    class Meta:
+        ordering = ('-pub_date', '-pk')
+        constraints = [
+            models.UniqueConstraint(
+                name='prevent_double_timeline_entry',
+                fields=('user', 'post',),
+            ),
+        ]
+        indexes = [
+            models.Index(
+                name='timeline_user_pub_date_idx',
+                fields=('user', '-pub_date', '-id',),
+            ),
+        ]
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Лента подписок'
+
+    def __str__(self):
+        return f'{self.user} <- {self.post}'
+
+
+class AuthorStats(models.Model):
+    """Денормализованные счётчики пользователя."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+    )
+    posts_count = models.PositiveIntegerField(
+        'Количество публикаций',
+        default=0,
+    )
+    followers_count = models.PositiveIntegerField(
+        'Количество подписчиков',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Статистику автора'
+        verbose_name_plural = 'Статистика авторов'
+
+    def __str__(self):
+        return f'{self.user}: {self.posts_count}/{self.followers_count}'
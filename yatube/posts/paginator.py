@@ -0,0 +1,191 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.core.paginator import Page, Paginator
+from django.db.models import Max, Q, QuerySet
+from django.utils.functional import cached_property
+
+from .settings import ESTIMATED_COUNT_THRESHOLD, PAGINATOR_WINDOW
+
+
+class WindowedPage(Page):
+    @property
+    def window(self) -> list:
+        """
+        Номера страниц вокруг текущей для панели навигации.
+
+        Первая и последняя страницы присутствуют всегда, пропуски
+        обозначены None.
+        """
+        num_pages = self.paginator.num_pages
+        start = max(self.number - PAGINATOR_WINDOW, 1)
+        end = min(self.number + PAGINATOR_WINDOW, num_pages)
+        window = list(range(start, end + 1))
+        if start > 1:
+            window = [1] + ([None] if start > 2 else []) + window
+        if end < num_pages:
+            window += ([None] if end < num_pages - 1 else []) + [num_pages]
+        return window
+
+
+class WindowedPaginator(Paginator):
+    def _get_page(self, *args, **kwargs):
+        return WindowedPage(*args, **kwargs)
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Паджинатор, не считающий строки больших таблиц без фильтров.
+
+    Для выборки без условий число строк оценивается по наибольшему
+    первичному ключу, что для SQLite не требует обхода таблицы. Если
+    оценка меньше ESTIMATED_COUNT_THRESHOLD или выборка отфильтрована,
+    считается точное значение.
+    """
+
+    @cached_property
+    def count(self) -> int:
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = queryset.order_by().aggregate(
+                max_pk=Max('pk'))['max_pk'] or 0
+            if estimate > ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
+
+
+class CursorPage:
+    """Страница курсорного паджинатора."""
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage {self.previous_cursor}..{self.next_cursor}>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self) -> bool:
+        return self.next_cursor is not None
+
+    def has_previous(self) -> bool:
+        return self.previous_cursor is not None
+
+    def has_other_pages(self) -> bool:
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    Паджинатор по ключу сортировки (keyset pagination).
+
+    В отличие от Paginator не выполняет COUNT и OFFSET: каждая страница
+    выбирается условием "после/до последнего показанного ключа", которое
+    обслуживается индексом по полям сортировки. Курсоры непрозрачны для
+    клиента и содержат значения ключа граничного объекта.
+
+    Args:
+        object_list: Все объекты
+        per_page: Количество объектов на странице
+        ordering: Поля сортировки, последнее должно быть уникальным
+    """
+    NEXT = 'n'
+    PREVIOUS = 'p'
+
+    def __init__(self, object_list: QuerySet, per_page: int,
+                 ordering: tuple = ('-pub_date', '-pk')):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+        self.ordering = ordering
+
+    def _fields(self):
+        meta = self.object_list.model._meta
+        return [meta.pk if name == 'pk' else meta.get_field(name)
+                for name in (field.lstrip('-') for field in self.ordering)]
+
+    def _key(self, obj) -> list:
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    def encode_cursor(self, obj, direction: str) -> str:
+        values = [value.isoformat() if hasattr(value, 'isoformat') else value
+                  for value in self._key(obj)]
+        raw = json.dumps([direction, values]).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+    def decode_cursor(self, cursor: str):
+        """Возвращает (направление, ключ) или None для битого курсора."""
+        try:
+            raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+            direction, values = json.loads(raw)
+            fields = self._fields()
+            if (direction not in (self.NEXT, self.PREVIOUS)
+                    or not isinstance(values, list)
+                    or len(values) != len(fields)):
+                return None
+            key = [field.to_python(value)
+                   for field, value in zip(fields, values)]
+        except (binascii.Error, ValueError, TypeError, ValidationError):
+            return None
+        if any(value is None for value in key):
+            return None
+        return direction, key
+
+    def _after(self, key: list, reverse: bool) -> Q:
+        condition = Q()
+        equal = {}
+        for field, value in zip(self.ordering, key):
+            name = field.lstrip('-')
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def _reversed_ordering(self) -> list:
+        return [field[1:] if field.startswith('-') else f'-{field}'
+                for field in self.ordering]
+
+    def get_page(self, cursor: str = None) -> CursorPage:
+        """
+        Возвращает страницу по курсору, для пустого или битого курсора
+        возвращается первая страница.
+        """
+        decoded = self.decode_cursor(cursor) if cursor else None
+        if decoded is None:
+            direction, key = self.NEXT, None
+        else:
+            direction, key = decoded
+        reverse = direction == self.PREVIOUS
+        queryset = self.object_list.order_by(
+            *(self._reversed_ordering() if reverse else self.ordering))
+        if key is not None:
+            queryset = queryset.filter(self._after(key, reverse))
+        objects = list(queryset[:self.per_page + 1])
+        has_more = len(objects) > self.per_page
+        objects = objects[:self.per_page]
+        if reverse and not objects:
+            return self.get_page()
+        if reverse:
+            objects.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, key is not None
+        return CursorPage(
+            objects,
+            next_cursor=(self.encode_cursor(objects[-1], self.NEXT)
+                         if has_next and objects else None),
+            previous_cursor=(self.encode_cursor(objects[0], self.PREVIOUS)
+                             if has_previous and objects else None),
+        )
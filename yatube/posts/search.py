@@ -0,0 +1,112 @@
+"""
+Полнотекстовый поиск по постам.
+
+На SQLite используется таблица FTS5 posts_post_search (миграция 0019),
+rowid которой совпадает с id поста. Индекс обновляется сигналами при
+сохранении и удалении постов и перестраивается пачками командой
+rebuild_search_index. На других базах поиск откатывается к icontains.
+"""
+import re
+
+from django.db import connection, transaction
+from django.db.models import Q, QuerySet
+from django.db.models.expressions import RawSQL
+
+from .bulk import batches
+from .models import Post
+from .settings import SEARCH_BATCH_SIZE
+
+SEARCH_TABLE = 'posts_post_search'
+WORD_RE = re.compile(r'\w+')
+
+
+def is_available() -> bool:
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query: str) -> str:
+    """
+    Переводит пользовательский запрос в выражение MATCH.
+
+    Синтаксис FTS5 пользователю не доступен: каждое слово берётся в
+    кавычки и ищется по префиксу, слова объединяются через AND.
+    """
+    return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+
+def index(post: Post) -> None:
+    """Добавляет пост в индекс или обновляет его запись."""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                       [post.pk])
+        cursor.execute(
+            f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+            'VALUES (%s, %s, %s)', [post.pk, post.title or '', post.text])
+
+
+def unindex(post_id: int) -> None:
+    """Удаляет пост из индекса."""
+    if not is_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE} WHERE rowid = %s',
+                       [post_id])
+
+
+@transaction.atomic
+def rebuild() -> None:
+    """Перестраивает индекс пачками по SEARCH_BATCH_SIZE постов."""
+    if not is_available():
+        return
+    rows = (Post.objects
+            .order_by('pk')
+            .values_list('pk', 'title', 'text')
+            .iterator(chunk_size=SEARCH_BATCH_SIZE))
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {SEARCH_TABLE}')
+        for batch in batches(rows, SEARCH_BATCH_SIZE):
+            cursor.executemany(
+                f'INSERT INTO {SEARCH_TABLE} (rowid, title, text) '
+                'VALUES (%s, %s, %s)',
+                [(pk, title or '', text) for pk, title, text in batch])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('optimize')")
+
+
+def matching(queryset: QuerySet, query: str) -> QuerySet:
+    """Оставляет в queryset только посты, подходящие под запрос."""
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if not is_available():
+        words = WORD_RE.findall(query)
+        condition = Q()
+        for word in words:
+            condition &= Q(title__icontains=word) | Q(text__icontains=word)
+        return queryset.filter(condition)
+    return queryset.filter(pk__in=RawSQL(
+        f'SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s',
+        [expression]))
+
+
+def search(query: str, queryset: QuerySet = None) -> QuerySet:
+    """
+    Возвращает посты по запросу, отсортированные по релевантности.
+
+    Релевантность считается функцией bm25 с весом заголовка выше текста;
+    при равной релевантности новые посты идут первыми.
+    """
+    if queryset is None:
+        queryset = Post.objects.all()
+    expression = match_expression(query)
+    if not expression or not is_available():
+        return matching(queryset, query).order_by('-pub_date', '-pk')
+    return queryset.extra(
+        tables=[SEARCH_TABLE],
+        where=[f'{SEARCH_TABLE}.rowid = posts_post.id',
+               f'{SEARCH_TABLE} MATCH %s'],
+        params=[expression],
+        select={'rank': f'bm25({SEARCH_TABLE}, 10.0, 1.0)'},
+    ).order_by('rank', '-pub_date', '-pk')
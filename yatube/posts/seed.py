@@ -0,0 +1,274 @@
+"""
+Генерация синтетического набора данных для нагрузочных замеров.
+
+Объёмы задаются явно, распределения повторяют живой сайт: авторы, группы,
+популярные авторы в подписках и обсуждаемые посты выбираются по закону
+Ципфа, поэтому немногие «горячие» объекты собирают большую часть
+активности. Ранги раздаются случайной перестановкой, так что горячими
+оказываются не первые по pk объекты.
+
+Всё выводится из одного random.Random(seed) и Faker с тем же зерном:
+одинаковое зерно даёт одинаковые тексты, связи и смещения дат. Первичные
+ключи назначаются явно от наибольшего pk в базе, поэтому связи строятся
+без чтения вставленных строк. Запись идёт bulk_create пачками, каждая в
+своей транзакции; сигналы не срабатывают, и производные данные
+перестраиваются один раз в конце.
+"""
+import datetime
+import random
+from array import array
+from collections import Counter
+from io import BytesIO
+from itertools import accumulate
+from typing import Callable, Iterator, Sequence
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from faker import Faker
+from PIL import Image, ImageDraw
+
+from . import transfer
+from .bulk import batches
+from .models import Comment, Follow, Group, Post, User
+from .settings import (SEED_BATCH_SIZE, SEED_IMAGES_POOL, SEED_PASSWORD,
+                       SEED_PERIOD_DAYS, SEED_ZIPF_EXPONENT)
+
+USER = 'user'
+GROUP = 'group'
+POST = 'post'
+COMMENT = 'comment'
+FOLLOW = 'follow'
+
+SENTENCES_POOL = 2000
+TITLES_POOL = 500
+SENTENCES_PER_POST = (1, 8)
+SENTENCES_PER_COMMENT = (1, 2)
+GROUPLESS_SHARE = 0.3
+FOLLOW_ROUNDS = 10
+IMAGE_SIZE = (1280, 720)
+
+
+def _max_pk(model) -> int:
+    return model.objects.aggregate(max_pk=Max('pk'))['max_pk'] or 0
+
+
+class Skewed:
+    """Выбор из ids с весами по закону Ципфа от случайного ранга."""
+
+    def __init__(self, rng: random.Random, ids: Sequence[int],
+                 exponent: float = SEED_ZIPF_EXPONENT):
+        self.rng = rng
+        self.ids = list(ids)
+        rng.shuffle(self.ids)
+        self.cum_weights = list(accumulate(
+            rank ** -exponent for rank in range(1, len(self.ids) + 1)))
+
+    def sample(self, count: int) -> list:
+        return self.rng.choices(self.ids, cum_weights=self.cum_weights,
+                                k=count)
+
+
+class Seeder:
+    def __init__(self, seed: int = 0, batch_size: int = SEED_BATCH_SIZE,
+                 now: datetime.datetime = None):
+        self.seed = seed
+        self.rng = random.Random(seed)
+        self.faker = Faker('ru_RU')
+        self.faker.seed_instance(seed)
+        self.batch_size = batch_size
+        self.now = (now or timezone.now()).timestamp()
+        self.created = Counter()
+        self.user_ids = []
+        self.group_ids = []
+        self.post_ids = range(0)
+        # Время публикации постов по порядку post_ids, для дат комментариев
+        self._post_times = array('d')
+        self._sentences = [self.faker.sentence()
+                           for _ in range(SENTENCES_POOL)]
+        self._titles = [self.faker.sentence(nb_words=4).rstrip('.')
+                        for _ in range(TITLES_POOL)]
+
+    def _write(self, rows: Iterator, model, kind: str) -> None:
+        for batch in batches(rows, self.batch_size):
+            with transaction.atomic():
+                model.objects.bulk_create(batch)
+            self.created[kind] += len(batch)
+
+    def _text(self, sentences: tuple) -> str:
+        return ' '.join(self.rng.choices(self._sentences,
+                                         k=self.rng.randint(*sentences)))
+
+    def _datetime(self, timestamp: float) -> datetime.datetime:
+        return datetime.datetime.fromtimestamp(timestamp,
+                                               tz=datetime.timezone.utc)
+
+    def seed_users(self, count: int) -> None:
+        offset = _max_pk(User)
+        # Хеш считается один раз: make_password на каждого пользователя
+        # занял бы основное время генерации
+        password = make_password(SEED_PASSWORD)
+        self.user_ids = range(offset + 1, offset + count + 1)
+        self._write((User(pk=pk, username=f'seed{pk}', password=password,
+                          first_name=self.faker.first_name(),
+                          last_name=self.faker.last_name())
+                     for pk in self.user_ids), User, USER)
+
+    def seed_groups(self, count: int) -> None:
+        offset = _max_pk(Group)
+        self.group_ids = range(offset + 1, offset + count + 1)
+        self._write((Group(pk=pk, slug=f'seed-{pk}',
+                           title=self.rng.choice(self._titles),
+                           description=self._text(SENTENCES_PER_COMMENT))
+                     for pk in self.group_ids), Group, GROUP)
+
+    def _image_pool(self) -> list:
+        """Несколько настоящих JPEG, общих для всех постов с картинкой."""
+        names = []
+        for num in range(SEED_IMAGES_POOL):
+            image = Image.new('RGB', IMAGE_SIZE, tuple(
+                self.rng.randrange(256) for _ in range(3)))
+            ImageDraw.Draw(image).ellipse(
+                (IMAGE_SIZE[0] // 4, 0, IMAGE_SIZE[0] * 3 // 4, IMAGE_SIZE[1]),
+                fill=tuple(self.rng.randrange(256) for _ in range(3)))
+            name = f'posts/seed_{self.seed}_{num}.jpg'
+            # Повторный запуск с тем же зерном переиспользует файлы
+            if not default_storage.exists(name):
+                output = BytesIO()
+                image.save(output, 'JPEG')
+                name = default_storage.save(name,
+                                            ContentFile(output.getvalue()))
+            names.append(name)
+        return names
+
+    def seed_posts(self, count: int, image_share: float) -> None:
+        offset = _max_pk(Post)
+        self.post_ids = range(offset + 1, offset + count + 1)
+        authors = Skewed(self.rng, self.user_ids)
+        groups = Skewed(self.rng, self.group_ids) if self.group_ids else None
+        images = self._image_pool() if image_share else []
+        period = SEED_PERIOD_DAYS * 24 * 60 * 60
+        self._post_times = array('d', (
+            self.now - self.rng.random() * period for _ in self.post_ids))
+
+        def rows():
+            for pks in batches(self.post_ids, self.batch_size):
+                author_ids = authors.sample(len(pks))
+                group_ids = (groups.sample(len(pks)) if groups
+                             else [None] * len(pks))
+                for pk, author_id, group_id in zip(pks, author_ids,
+                                                   group_ids):
+                    if self.rng.random() < GROUPLESS_SHARE:
+                        group_id = None
+                    image = ''
+                    if images and self.rng.random() < image_share:
+                        image = self.rng.choice(images)
+                    yield Post(
+                        pk=pk, author_id=author_id, group_id=group_id,
+                        title=self.rng.choice(self._titles),
+                        text=self._text(SENTENCES_PER_POST),
+                        pub_date=self._datetime(
+                            self._post_times[pk - offset - 1]),
+                        image=image, has_image=bool(image))
+
+        self._write(rows(), Post, POST)
+
+    def seed_follows(self, count: int) -> None:
+        followers = self.user_ids
+        authors = Skewed(self.rng, self.user_ids)
+
+        def rows(count):
+            for chunk in batches(range(count), self.batch_size):
+                author_ids = authors.sample(len(chunk))
+                for author_id in author_ids:
+                    user_id = self.rng.choice(followers)
+                    if user_id != author_id:
+                        yield Follow(user_id=user_id, author_id=author_id)
+
+        # Повторные пары отбрасывает уникальное ограничение; недостачу
+        # добирают следующие раунды. Если почти все пары уже заняты,
+        # подписок выйдет меньше заказанного
+        before = Follow.objects.count()
+        for _ in range(FOLLOW_ROUNDS):
+            missing = count - self.created[FOLLOW]
+            if missing <= 0:
+                break
+            for batch in batches(rows(missing), self.batch_size):
+                with transaction.atomic():
+                    Follow.objects.bulk_create(batch, ignore_conflicts=True)
+            self.created[FOLLOW] = Follow.objects.count() - before
+
+    def seed_comments(self, count: int) -> None:
+        posts = Skewed(self.rng, self.post_ids)
+        authors = Skewed(self.rng, self.user_ids)
+        offset = self.post_ids.start - 1
+
+        def rows():
+            for chunk in batches(range(count), self.batch_size):
+                post_ids = posts.sample(len(chunk))
+                author_ids = authors.sample(len(chunk))
+                for post_id, author_id in zip(post_ids, author_ids):
+                    published = self._post_times[post_id - offset - 1]
+                    created = published + (self.rng.random()
+                                           * (self.now - published))
+                    yield Comment(post_id=post_id, author_id=author_id,
+                                  text=self._text(SENTENCES_PER_COMMENT),
+                                  created=self._datetime(created))
+
+        self._write(rows(), Comment, COMMENT)
+
+
+def seed(users: int, groups: int, posts: int, follows: int, comments: int,
+         image_share: float = 0, seed: int = 0,
+         batch_size: int = SEED_BATCH_SIZE, timelines: bool = True,
+         progress: Callable[[str, int], None] = None) -> Counter:
+    """
+    Наполняет базу синтетическими данными и перестраивает производные.
+
+    Args:
+        users: Число пользователей
+        groups: Число групп
+        posts: Число постов
+        follows: Число подписок до отбрасывания повторов
+        comments: Число комментариев
+        image_share: Доля постов с изображением, от 0 до 1
+        seed: Зерно генератора
+        batch_size: Число строк в одной транзакции
+        timelines: Перестраивать ли ленты подписок; на миллионах подписок
+            это самый долгий шаг
+        progress: Вызывается после каждого этапа с его названием и числом
+            созданных объектов
+
+    Returns:
+        Число созданных объектов по типам
+
+    Raises:
+        ValueError: Постам, подпискам и комментариям не хватает
+            пользователей или постов
+    """
+    if (posts or comments) and not users:
+        raise ValueError('Постам и комментариям нужны пользователи')
+    if follows and users < 2:
+        raise ValueError('Для подписок нужно хотя бы два пользователя')
+    if comments and not posts:
+        raise ValueError('Комментариям нужны посты')
+    if not 0 <= image_share <= 1:
+        raise ValueError('Доля постов с изображением — от 0 до 1')
+    seeder = Seeder(seed, batch_size)
+    steps = (
+        (USER, lambda: seeder.seed_users(users)),
+        (GROUP, lambda: seeder.seed_groups(groups)),
+        (POST, lambda: seeder.seed_posts(posts, image_share)),
+        (FOLLOW, lambda: seeder.seed_follows(follows)),
+        (COMMENT, lambda: seeder.seed_comments(comments)),
+    )
+    for kind, step in steps:
+        step()
+        if progress:
+            progress(kind, seeder.created[kind])
+    transfer.reset_sequences(User, Group, Post)
+    transfer.rebuild_derived(timelines=timelines)
+    return seeder.created
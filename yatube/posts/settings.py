@@ -1,2 +1,21 @@
 EMPTY_VALUE_DISPLAY = '-пусто-'
 DEFAULT_AMOUNT_POSTS_ON_PAGE = 10
+TIMELINE_MAX_ENTRIES = 5000
+TIMELINE_BATCH_SIZE = 500
+PAGINATOR_WINDOW = 2
+CAROUSEL_SIZE = 3
+CAROUSEL_CACHE_TIMEOUT = 60 * 60 * 24
+COUNTERS_BATCH_SIZE = 1000
+COMMENTS_PER_PAGE = 20
+IMAGE_MAX_SIZE = (2560, 2560)
+IMAGE_QUALITY = 85
+KEEP_ORIGINAL_IMAGES = False
+SEARCH_BATCH_SIZE = 1000
+ESTIMATED_COUNT_THRESHOLD = 10000
+TRANSFER_BATCH_SIZE = 1000
+SEED_BATCH_SIZE = 10000
+SEED_ZIPF_EXPONENT = 1.1
+SEED_PERIOD_DAYS = 365
+SEED_IMAGES_POOL = 8
+SEED_PASSWORD = 'seed-password'
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
@@ -0,0 +1,152 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from core.tasks import run_in_background
+
+from . import (carousel, counters, deletion, generations, images, search,
+               timeline)
+from .models import AuthorStats, Comment, Follow, Group, Post
+
+
+@receiver(post_save, sender=Post)
+def add_post_to_timelines(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        run_in_background(timeline.fan_out, instance.pk)
+
+
+@receiver(post_save, sender=Follow)
+def backfill_timeline(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        timeline.backfill(instance.user_id, instance.author_id)
+
+
+@receiver(post_delete, sender=Follow)
+def prune_timeline(sender, instance, **kwargs):
+    timeline.prune(instance.user_id, instance.author_id)
+
+
+@receiver((post_save, post_delete), sender=Post)
+def refresh_carousel(sender, instance, raw=False, **kwargs):
+    if not raw:
+        carousel.refresh_if_affected(instance)
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def create_author_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        AuthorStats.objects.get_or_create(user=instance)
+
+
+@receiver(post_save, sender=Post)
+def increment_posts_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_author_stats(instance.author_id, posts_count=1)
+
+
+@receiver(post_delete, sender=Post)
+def decrement_posts_count(sender, instance, **kwargs):
+    counters.change_author_stats(instance.author_id, posts_count=-1)
+
+
+@receiver(post_save, sender=Post)
+def update_group_posts_count(sender, instance, created, raw=False, **kwargs):
+    if not raw:
+        counters.move_post_between_groups(instance, created)
+
+
+@receiver(post_delete, sender=Post)
+def decrement_group_posts_count(sender, instance, **kwargs):
+    counters.change_group_posts_count(instance.group_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def increment_followers_count(sender, instance, created, raw=False,
+                              **kwargs):
+    if created and not raw:
+        counters.change_author_stats(instance.author_id, followers_count=1)
+
+
+@receiver(post_delete, sender=Follow)
+def decrement_followers_count(sender, instance, **kwargs):
+    counters.change_author_stats(instance.author_id, followers_count=-1)
+
+
+@receiver(pre_delete, sender=Post)
+def mark_post_deleting(sender, instance, **kwargs):
+    deletion.mark(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unmark_post_deleting(sender, instance, **kwargs):
+    deletion.unmark(instance.pk)
+
+
+@receiver(post_save, sender=Comment)
+def increment_comments_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        counters.change_post_comments_count(instance.post_id, 1)
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comments_count(sender, instance, **kwargs):
+    if not deletion.is_deleting(instance.post_id):
+        counters.change_post_comments_count(instance.post_id, -1)
+
+
+@receiver((post_save, post_delete), sender=Post)
+def invalidate_post_feeds(sender, instance, raw=False, **kwargs):
+    if not raw:
+        generations.bump_post_feeds(instance)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def invalidate_post_page(sender, instance, raw=False, **kwargs):
+    if not raw and not deletion.is_deleting(instance.post_id):
+        generations.bump_post_page(instance.post_id)
+
+
+@receiver((post_save, post_delete), sender=Group)
+def invalidate_feeds_on_group_change(sender, raw=False, **kwargs):
+    if not raw:
+        generations.bump_all_feeds()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def invalidate_feeds_on_user_change(sender, created, raw=False,
+                                    update_fields=None, **kwargs):
+    # Новый пользователь ещё не виден в лентах, а вход меняет только
+    # last_login
+    if created or raw:
+        return
+    if update_fields and set(update_fields) <= {'last_login'}:
+        return
+    generations.bump_all_feeds()
+
+
+@receiver(post_save, sender=Post)
+def queue_image_processing(sender, instance, created, raw=False,
+                           update_fields=None, **kwargs):
+    if raw or not instance.image:
+        return
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    if not created and instance.image.name == getattr(
+            instance, '_loaded_image', None):
+        return
+    run_in_background(images.process_post_image, instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def index_post(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {'title', 'text'} & set(
+            update_fields):
+        return
+    search.index(instance)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_post(sender, instance, **kwargs):
+    search.unindex(instance.pk)
@@ -0,0 +1,63 @@
+from django import template
+from django.utils.safestring import mark_safe
+
+from .. import cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """
+    Выводит карточки постов из кеша карточек.
+
+    Карточка рендерится в отдельном контексте, где есть только пост,
+    флаги варианта и thumbnail_resolver: в кешируемый HTML не должно
+    попасть ничего, что зависит от посетителя.
+
+    Пример: {% post_cards page_obj %}
+    """
+    match = context['request'].resolver_match
+    flags = cards.variant(match.view_name if match else None)
+    card_template = context.template.engine.get_template(cards.CARD_TEMPLATE)
+    resolver = context.get('thumbnail_resolver')
+
+    def render(post):
+        return card_template.render(context.new({
+            'post': post,
+            'action_marker': cards.action_marker(post),
+            'thumbnail_resolver': resolver,
+            **flags,
+        }))
+
+    return mark_safe(cards.render_cards(posts, render, flags))
+
+
+class PostActionsNode(template.Node):
+    def __init__(self, nodelist):
+        self.nodelist = nodelist
+
+    def render(self, context):
+        return cards.render_actions(self.nodelist.render(context),
+                                    context.get('user'))
+
+
+@register.tag
+def post_actions(parser, token):
+    """
+    Подставляет в карточки внутри блока ссылки текущего посетителя.
+
+    Блок должен охватывать и кешируемые фрагменты с карточками: замена
+    выполняется над уже готовым HTML.
+
+    Пример::
+
+        {% post_actions %}
+          {% cache 300 index_page feed_generation page_obj.number %}
+            {% post_cards page_obj %}
+          {% endcache %}
+        {% endpost_actions %}
+    """
+    nodelist = parser.parse(('endpost_actions',))
+    parser.delete_first_token()
+    return PostActionsNode(nodelist)
@@ -0,0 +1,40 @@
+from django import template
+
+from .. import thumbnails
+
+register = template.Library()
+
+
+@register.inclusion_tag('posts/includes/responsive_image.html',
+                        takes_context=True)
+def responsive_image(context, image, spec, css_class='', style='',
+                     loading='lazy'):
+    """
+    Выводит изображение с srcset из готовых вариантов миниатюры.
+
+    В srcset попадают только уже созданные варианты. Пока их нет,
+    выводится заглушка той же пропорции. Если представление передало
+    thumbnail_resolver, варианты читаются из него одним пакетом.
+
+    Пример: {% responsive_image post.image 'card' css_class='img-fluid' %}
+    """
+    resolver = context.get('thumbnail_resolver')
+    if resolver is not None:
+        variants = resolver.variants(image, spec)
+    else:
+        variants = thumbnails.existing_variants(image, spec)
+    ready = [(width, variant) for width, variant in sorted(variants.items())
+             if variant is not None]
+    width, height = thumbnails.spec_size(spec)
+    return {
+        'src': ready[-1][1].url if ready else None,
+        'srcset': ', '.join(f'{variant.url} {variant_width}w'
+                            for variant_width, variant in ready),
+        'sizes': thumbnails.SRCSET_SIZES[spec],
+        'width': width,
+        'height': height,
+        'ratio': f'{thumbnails.aspect_ratio(spec)}%',
+        'css_class': css_class,
+        'style': style,
+        'loading': loading,
+    }
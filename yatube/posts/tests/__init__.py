@@ -1,3 +1,7 @@
+import base64
+import json
+from unittest import mock
+
 from django.core.files.uploadedfile import SimpleUploadedFile
 from django.urls import reverse
 
@@ -29,6 +33,12 @@ UPLOADED_IMAGE = SimpleUploadedFile(
     content_type='image/gif'
 )
 
+# Фоновые задачи сигналов выполняются сразу: TestCase не фиксирует
+# транзакцию, и после фиксации они бы так и не запустились
+RUN_TASKS_INLINE = mock.patch(
+    'posts.signals.run_in_background',
+    lambda func, *args, **kwargs: func(*args, **kwargs))
+
 DISABLE_CACHING = {
     'CACHES': {
         'default': {
@@ -36,3 +46,27 @@ DISABLE_CACHING = {
         }
     }
 }
+
+
+def make_cursor(payload) -> str:
+    """Кодирует произвольное содержимое в формат курсора паджинатора."""
+    raw = json.dumps(payload).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+# Курсоры, которые нельзя разобрать: мусор, неверное число значений,
+# пустые и некорректные значения ключа
+GARBAGE_CURSORS = (
+    'garbage',
+    '%%%',
+    make_cursor('n'),
+    make_cursor(['n']),
+    make_cursor(['x', []]),
+    make_cursor(['n', 'ab']),
+    make_cursor(['n', [1]]),
+    make_cursor(['n', [1, 2, 3]]),
+    make_cursor(['n', [None, None]]),
+    make_cursor(['n', ['not-a-date', 1]]),
+    make_cursor(['n', ['2021-01-01T00:00:00', 'abc']]),
+    make_cursor(['p', [{}, []]]),
+)
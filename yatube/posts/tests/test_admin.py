@@ -0,0 +1,88 @@
+from unittest import mock
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+from ..paginator import EstimatedCountPaginator
+from . import DISABLE_CACHING
+
+
+@override_settings(**DISABLE_CACHING)
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        cls.groups = [
+            Group.objects.create(title=f'Группа {num}', slug=f'group-{num}',
+                                 description='Описание')
+            for num in range(3)
+        ]
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(AdminChangelistTests.admin)
+
+    def create_rows(self, amount):
+        for num in range(amount):
+            author = User.objects.create_user(
+                username=f'author{User.objects.count()}')
+            post = Post.objects.create(
+                text=f'Пост {num}', author=author,
+                group=AdminChangelistTests.groups[num % 3])
+            Comment.objects.create(post=post, author=author, text='Текст')
+            Follow.objects.create(user=AdminChangelistTests.admin,
+                                  author=author)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_changelist_query_count_is_fixed(self):
+        """Число запросов списков не зависит от числа строк."""
+        urls = [reverse(f'admin:posts_{model}_changelist')
+                for model in ('post', 'comment', 'follow')]
+        self.create_rows(1)
+        expected = {url: self.count_queries(url) for url in urls}
+        self.create_rows(10)
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.count_queries(url), expected[url])
+
+    def test_author_filter(self):
+        """Фильтр по автору не перечисляет пользователей и работает."""
+        self.create_rows(3)
+        response = self.client.get(reverse('admin:posts_post_changelist'),
+                                   {'author__username': 'author2'})
+        self.assertEqual(
+            [post.author.username
+             for post in response.context['cl'].result_list],
+            ['author2'])
+        self.assertNotContains(response, '?author__username=author1')
+
+    def test_follow_search_by_username(self):
+        """Подписки ищутся по имени пользователя."""
+        self.create_rows(2)
+        response = self.client.get(reverse('admin:posts_follow_changelist'),
+                                   {'q': 'author1'})
+        self.assertEqual(
+            [follow.author.username
+             for follow in response.context['cl'].result_list],
+            ['author1'])
+
+    def test_estimated_count(self):
+        """Без фильтров число строк большой таблицы оценивается."""
+        self.create_rows(3)
+        with mock.patch('posts.paginator.ESTIMATED_COUNT_THRESHOLD', 0):
+            paginator = EstimatedCountPaginator(Post.objects.all(), 10)
+            with self.assertNumQueries(1):
+                self.assertGreaterEqual(paginator.count, 3)
+            filtered = EstimatedCountPaginator(
+                Post.objects.filter(author__username='author1'), 10)
+            self.assertEqual(filtered.count, 1)
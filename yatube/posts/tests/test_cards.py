@@ -0,0 +1,108 @@
+import re
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from .. import thumbnails
+from ..models import Follow, Group, Post, User
+from . import RUN_TASKS_INLINE, TEST_GROUP_SLUG, TEST_USERNAME_AUTH
+
+ARTICLE = re.compile(r'<article class="card single_post">.*?</article>',
+                     re.DOTALL)
+
+
+class PostCardsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=TEST_GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(text='Тестовый пост',
+                                       author=cls.author, group=cls.group)
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def setUp(self):
+        cache.clear()
+        self.author_client = Client()
+        self.author_client.force_login(PostCardsTests.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(PostCardsTests.reader)
+        self.edit_url = reverse('posts:post_edit',
+                                args=[PostCardsTests.post.pk])
+
+    def test_edit_link_only_for_author(self):
+        """Ссылка редактирования видна только автору, хотя фрагмент ленты
+        общий."""
+        index = reverse('posts:index')
+        response = self.reader_client.get(index)
+        self.assertNotContains(response, self.edit_url)
+        self.assertNotContains(response, 'post-actions')
+        response = self.author_client.get(index)
+        self.assertContains(response, self.edit_url)
+
+    def test_card_reused_between_feeds(self):
+        """Карточка с тем же вариантом берётся из кеша в другой ленте."""
+        self.reader_client.get(reverse('posts:index'))
+        # Обновление мимо save не меняет версию карточки
+        Post.objects.filter(pk=PostCardsTests.post.pk).update(
+            text='Изменённый пост')
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'Тестовый пост')
+
+    def test_card_invalidated_on_save(self):
+        """Сохранение поста меняет его версию и карточку."""
+        self.reader_client.get(reverse('posts:follow_index'))
+        post = Post.objects.get(pk=PostCardsTests.post.pk)
+        post.text = 'Изменённый пост'
+        post.save(update_fields=['text'])
+        response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertContains(response, 'Изменённый пост')
+
+    def test_thumbnails_change_card_version(self):
+        """Готовые миниатюры меняют версию поста: карточка была с
+        заглушкой."""
+        post_id = PostCardsTests.post.pk
+        Post.objects.filter(pk=post_id).update(image='posts/image.jpg')
+        version = Post.objects.get(pk=post_id).updated_at
+        with mock.patch.object(thumbnails, 'generate'):
+            thumbnails.generate_for_post(post_id)
+        self.assertGreater(Post.objects.get(pk=post_id).updated_at, version)
+
+    def test_variants(self):
+        """В ленте группы нет ссылки на группу, в профиле — на автора."""
+        group_url = reverse('posts:group_list', args=[TEST_GROUP_SLUG])
+        profile_url = reverse('posts:profile', args=[TEST_USERNAME_AUTH])
+        pages = {
+            reverse('posts:index'): (group_url, profile_url),
+            group_url: (profile_url,),
+            profile_url: (group_url,),
+        }
+        for page, links in pages.items():
+            content = self.reader_client.get(page).content.decode()
+            card = ARTICLE.search(content).group()
+            for link in (group_url, profile_url):
+                with self.subTest(page=page, link=link):
+                    self.assertIs(f'href="{link}"' in card, link in links)
+
+    @RUN_TASKS_INLINE
+    def test_page_cards_read_at_once(self):
+        """Карточки страницы читаются из кеша одним запросом."""
+        for num in range(5):
+            Post.objects.create(text=f'Пост {num}',
+                                author=PostCardsTests.author)
+        self.reader_client.get(reverse('posts:follow_index'))
+        with mock.patch.object(cache, 'get_many',
+                               wraps=cache.get_many) as get_many:
+            response = self.reader_client.get(reverse('posts:follow_index'))
+        self.assertEqual(len(ARTICLE.findall(response.content.decode())), 6)
+        card_reads = [list(keys) for (keys,), _ in get_many.call_args_list
+                      if any(key.startswith('card:') for key in keys)]
+        self.assertEqual(len(card_reads), 1)
+        self.assertEqual(len(card_reads[0]), 6)
@@ -0,0 +1,198 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.db.models.signals import post_delete
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import AuthorStats, Comment, Follow, Group, Post, User
+from . import DISABLE_CACHING, TEST_GROUP_SLUG, TEST_USERNAME_AUTH
+
+
+@override_settings(**DISABLE_CACHING)
+class AuthorStatsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.author = User.objects.create_user(username='author')
+
+    def get_stats(self, user):
+        return AuthorStats.objects.get(user=user)
+
+    def test_posts_count_follows_posts(self):
+        """Счётчик публикаций меняется при создании и удалении поста."""
+        author = AuthorStatsTests.author
+        post = Post.objects.create(text='Тестовый пост', author=author)
+        Post.objects.create(text='Тестовый пост', author=author)
+        self.assertEqual(self.get_stats(author).posts_count, 2)
+        post.delete()
+        self.assertEqual(self.get_stats(author).posts_count, 1)
+
+    def test_followers_count_follows_subscriptions(self):
+        """Счётчик подписчиков меняется при подписке и отписке."""
+        author = AuthorStatsTests.author
+        auth_client = Client()
+        auth_client.force_login(AuthorStatsTests.user)
+        auth_client.get(reverse('posts:profile_follow',
+                                kwargs={'username': author.username}))
+        self.assertEqual(self.get_stats(author).followers_count, 1)
+        auth_client.get(reverse('posts:profile_unfollow',
+                                kwargs={'username': author.username}))
+        self.assertEqual(self.get_stats(author).followers_count, 0)
+
+    def test_user_delete_does_not_recreate_stats(self):
+        """Удаление автора не восстанавливает его счётчики."""
+        author = User.objects.create_user(username='removed')
+        Post.objects.create(text='Тестовый пост', author=author)
+        Follow.objects.create(user=AuthorStatsTests.user, author=author)
+        author.delete()
+        self.assertFalse(AuthorStats.objects.filter(user=author.pk).exists())
+
+    def test_rebuild_counters_repairs_stats(self):
+        """Команда rebuild_counters восстанавливает счётчики."""
+        author = AuthorStatsTests.author
+        Post.objects.create(text='Тестовый пост', author=author)
+        Follow.objects.create(user=AuthorStatsTests.user, author=author)
+        AuthorStats.objects.all().delete()
+        call_command('rebuild_counters', stdout=StringIO())
+        stats = self.get_stats(author)
+        self.assertEqual((stats.posts_count, stats.followers_count), (1, 1))
+        self.assertEqual(self.get_stats(AuthorStatsTests.user).posts_count, 0)
+
+    def test_authors_page_uses_counters(self):
+        """Страница авторов выводит счётчики одним запросом к авторам."""
+        author = AuthorStatsTests.author
+        for num in range(3):
+            Post.objects.create(text=f'Тестовый пост {num}', author=author)
+        Follow.objects.create(user=AuthorStatsTests.user, author=author)
+        with self.assertNumQueries(3):
+            response = Client().get(reverse('posts:authors'))
+        self.assertEqual(list(response.context.get('authors')), [author])
+        self.assertContains(response, 'Подписчиков: 1')
+
+
+@override_settings(**DISABLE_CACHING)
+class GroupPostsCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=TEST_GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+            description='Тестовое описание',
+        )
+
+    def setUp(self):
+        self.auth_client = Client()
+        self.auth_client.force_login(GroupPostsCountTests.user)
+
+    def get_counts(self):
+        return list(Group.objects.order_by('pk')
+                    .values_list('posts_count', flat=True))
+
+    def test_posts_count_follows_post_group(self):
+        """Счётчик группы меняется при создании, переносе поста
+        в другую группу и удалении."""
+        group = GroupPostsCountTests.group
+        other_group = GroupPostsCountTests.other_group
+        self.auth_client.post(reverse('posts:post_create'),
+                              data={'text': 'Тестовый пост',
+                                    'group': group.pk})
+        self.assertEqual(self.get_counts(), [1, 0])
+
+        post = Post.objects.get()
+        self.auth_client.post(
+            reverse('posts:post_edit', kwargs={'post_id': post.pk}),
+            data={'text': 'Тестовый пост', 'group': other_group.pk})
+        self.assertEqual(self.get_counts(), [0, 1])
+
+        post = Post.objects.get()
+        post.group = None
+        post.save()
+        post.group = group
+        post.save()
+        self.assertEqual(self.get_counts(), [1, 0])
+
+        post.delete()
+        self.assertEqual(self.get_counts(), [0, 0])
+
+    def test_groups_page_shows_only_not_empty_groups(self):
+        """Страница групп выводит только непустые группы одним запросом."""
+        Post.objects.create(text='Тестовый пост',
+                            author=GroupPostsCountTests.user,
+                            group=GroupPostsCountTests.group)
+        with self.assertNumQueries(3):
+            response = Client().get(reverse('posts:groups'))
+        self.assertEqual(list(response.context.get('groups')),
+                         [GroupPostsCountTests.group])
+        self.assertEqual(response.context.get('groups')[0].posts_count, 1)
+
+    def test_rebuild_counters_repairs_groups(self):
+        """Команда rebuild_counters восстанавливает счётчики групп."""
+        Post.objects.create(text='Тестовый пост',
+                            author=GroupPostsCountTests.user,
+                            group=GroupPostsCountTests.group)
+        Group.objects.update(posts_count=10)
+        call_command('rebuild_counters', stdout=StringIO())
+        self.assertEqual(self.get_counts(), [1, 0])
+
+
+@override_settings(**DISABLE_CACHING)
+class PostCommentsCountTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+
+    def create_post(self, amount_comments: int) -> Post:
+        post = Post.objects.create(text='Тестовый пост',
+                                   author=PostCommentsCountTests.user)
+        for num in range(amount_comments):
+            Comment.objects.create(post=post,
+                                   author=PostCommentsCountTests.user,
+                                   text=f'Комментарий {num}')
+        return post
+
+    def test_comments_count_follows_comments(self):
+        """Счётчик комментариев уменьшается при удалении комментария."""
+        post = self.create_post(2)
+        post.comments.first().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
+
+    def test_post_delete_does_not_depend_on_comments(self):
+        """Удаление поста не обновляет его на каждый комментарий."""
+        queries = []
+        for amount_comments in (1, 10):
+            post = self.create_post(amount_comments)
+            with CaptureQueriesContext(connection) as context:
+                post.delete()
+            queries.append(len(context.captured_queries))
+        self.assertEqual(queries[0], queries[1])
+
+    def test_failed_post_delete_clears_marker(self):
+        """Прерванное ошибкой удаление поста не отключает счётчик его
+        комментариев."""
+        post = self.create_post(2)
+
+        def fail(sender, **kwargs):
+            raise RuntimeError
+
+        post_delete.connect(fail, sender=Comment)
+        try:
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                post.delete()
+        finally:
+            post_delete.disconnect(fail, sender=Comment)
+        post.comments.first().delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 1)
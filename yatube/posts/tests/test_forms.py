@@ -111,6 +111,8 @@ class PostCommentsTest(TestCase):
         self.assertTrue(post.comments.filter(
             text='Тестовый комментарий'
         ).exists())
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, amount_comments + 1)
 
     def test_guest_can_not_create_comment(self):
         """Проверяем, что гость не может оставить комментарий."""
@@ -0,0 +1,98 @@
+import shutil
+import tempfile
+from io import BytesIO
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from .. import images, thumbnails
+from ..models import Post, User
+from ..settings import IMAGE_MAX_SIZE
+from . import DISABLE_CACHING, TEST_USERNAME_AUTH
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+ORIENTATION_TAG = 0x0112
+ROTATED_90 = 6
+
+
+def photo(width, height, orientation=None):
+    """JPEG с EXIF, как у снимка с телефона."""
+    exif = Image.Exif()
+    exif[ORIENTATION_TAG] = orientation or 1
+    output = BytesIO()
+    Image.new('RGB', (width, height), 'red').save(
+        output, 'JPEG', exif=exif.tobytes())
+    return SimpleUploadedFile('photo.jpg', output.getvalue(),
+                              content_type='image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, **DISABLE_CACHING)
+class ImageNormalizationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_large_photo_normalized(self):
+        """Большой снимок уменьшается, поворачивается и теряет EXIF."""
+        post = Post.objects.create(
+            text='Пост с фото', author=ImageNormalizationTests.user,
+            image=photo(1000, 3000, ROTATED_90))
+        original = post.image.name
+        images.process_post_image(post.pk)
+
+        post.refresh_from_db()
+        self.assertNotEqual(post.image.name, original)
+        self.assertFalse(default_storage.exists(original))
+        with post.image.open('rb') as file:
+            image = Image.open(file)
+            # После поворота снимок стал горизонтальным
+            self.assertEqual(image.width, IMAGE_MAX_SIZE[0])
+            self.assertLess(image.height, image.width)
+            self.assertFalse(image.getexif())
+        self.assertIsNotNone(
+            thumbnails.existing_thumbnail(post.image, 'card'))
+
+    def test_normalized_image_left_as_is(self):
+        """Уже нормализованное изображение не перекодируется."""
+        post = Post.objects.create(text='Пост с фото',
+                                   author=ImageNormalizationTests.user,
+                                   image=photo(10, 10))
+        self.assertTrue(images.normalize_post_image(post))
+        self.assertFalse(images.normalize_post_image(post))
+
+    def test_replaced_image_not_overwritten(self):
+        """Если изображение сменили во время обработки, результат
+        отбрасывается."""
+        post = Post.objects.create(text='Пост с фото',
+                                   author=ImageNormalizationTests.user,
+                                   image=photo(10, 10, ROTATED_90))
+        Post.objects.filter(pk=post.pk).update(image='posts/other.jpg')
+        self.assertFalse(images.normalize_post_image(post))
+        post.refresh_from_db()
+        self.assertEqual(post.image.name, 'posts/other.jpg')
+
+    def test_feeds_bumped_before_original_deleted(self):
+        """Кеши страниц сбрасываются до удаления исходника, даже если
+        миниатюры потом не создались."""
+        post = Post.objects.create(text='Пост с фото',
+                                   author=ImageNormalizationTests.user,
+                                   image=photo(10, 10, ROTATED_90))
+        original = post.image.name
+        calls = []
+        with mock.patch.object(
+                images.generations, 'bump_post_feeds',
+                lambda post: calls.append(default_storage.exists(original))):
+            self.assertTrue(images.normalize_post_image(post))
+        self.assertEqual(calls, [True])
+        self.assertFalse(default_storage.exists(original))
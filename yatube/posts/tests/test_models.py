@@ -67,6 +67,15 @@ class PostModelTest(TestCase):
                     PostModelTest.post._meta.get_field(field).help_text,
                     expected_value)
 
+    def test_post_has_image_follows_image(self):
+        """Проверяем, что признак has_image отражает наличие картинки."""
+        post = PostModelTest.post
+        self.assertFalse(post.has_image)
+        post.image = 'posts/small.gif'
+        post.save(update_fields=['image'])
+        post.refresh_from_db()
+        self.assertTrue(post.has_image)
+
 
 class FollowModelTest(TestCase):
     @classmethod
@@ -0,0 +1,81 @@
+import datetime
+
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import Post, User
+from ..paginator import CursorPaginator, WindowedPaginator
+from ..settings import DEFAULT_AMOUNT_POSTS_ON_PAGE
+from . import GARBAGE_CURSORS, TEST_USERNAME_AUTH
+
+
+class CursorPaginatorTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.posts = Post.objects.bulk_create([
+            Post(pk=num,
+                 text=f'Тестовый пост {num}',
+                 author=user,
+                 ) for num in range(1, 14)
+        ])
+        pub_date = timezone.now()
+        for post in cls.posts:
+            # У двух постов одинаковая дата, порядок решает pk
+            post.pub_date = pub_date + datetime.timedelta(
+                days=min(post.pk, 12))
+        Post.objects.bulk_update(cls.posts, ['pub_date'])
+        cls.expected = list(Post.objects.order_by('-pub_date', '-pk'))
+
+    def setUp(self):
+        self.paginator = CursorPaginator(Post.objects.all(),
+                                         DEFAULT_AMOUNT_POSTS_ON_PAGE)
+
+    def test_pages_follow_each_other(self):
+        """Курсоры ведут на следующую и предыдущую страницы."""
+        first_page = self.paginator.get_page()
+        self.assertEqual(first_page.object_list,
+                         CursorPaginatorTests.expected[:10])
+        self.assertFalse(first_page.has_previous())
+        self.assertTrue(first_page.has_next())
+
+        second_page = self.paginator.get_page(first_page.next_cursor)
+        self.assertEqual(second_page.object_list,
+                         CursorPaginatorTests.expected[10:])
+        self.assertFalse(second_page.has_next())
+
+        previous_page = self.paginator.get_page(second_page.previous_cursor)
+        self.assertEqual(previous_page.object_list,
+                         CursorPaginatorTests.expected[:10])
+        self.assertFalse(previous_page.has_previous())
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Битый курсор возвращает первую страницу."""
+        for cursor in ('', *GARBAGE_CURSORS):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(
+                    self.paginator.get_page(cursor).object_list,
+                    CursorPaginatorTests.expected[:10])
+
+    def test_cursor_page_does_not_count(self):
+        """Курсорная страница выбирается одним запросом без COUNT."""
+        cursor = self.paginator.get_page().next_cursor
+        with self.assertNumQueries(1):
+            self.paginator.get_page(cursor)
+
+
+class WindowedPaginatorTests(TestCase):
+    def test_window_is_limited(self):
+        """Панель страниц показывает только окно вокруг текущей."""
+        paginator = WindowedPaginator(range(1000), 10)
+        cases = {
+            1: [1, 2, 3, None, 100],
+            4: [1, 2, 3, 4, 5, 6, None, 100],
+            50: [1, None, 48, 49, 50, 51, 52, None, 100],
+            100: [1, None, 98, 99, 100],
+        }
+        for number, expected in cases.items():
+            with self.subTest(number=number):
+                self.assertEqual(paginator.page(number).window, expected)
+        self.assertEqual(WindowedPaginator(range(3), 10).page(1).window, [1])
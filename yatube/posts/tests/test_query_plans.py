@@ -0,0 +1,111 @@
+import re
+
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post, User
+from ..urls import app_name, urlpatterns
+from . import DISABLE_CACHING, TEST_GROUP_SLUG, TEST_USERNAME_AUTH
+
+FEED_TABLES = (
+    'posts_post',
+    'posts_comment',
+    'posts_follow',
+    'posts_timelineentry',
+)
+FULL_SCAN = re.compile(
+    r'^SCAN (?:TABLE )?(?P<table>\w+)(?: AS \w+)?$')
+TEMP_SORT = 'USE TEMP B-TREE FOR'
+SORT_CLAUSES = ('ORDER BY', 'RIGHT PART OF ORDER BY')
+
+
+def explain(sql: str) -> list:
+    """Возвращает строки EXPLAIN QUERY PLAN для запроса SQLite."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+def plan_problems(sql: str) -> list:
+    """
+    Ищет в плане запроса полный просмотр таблиц ленты и сортировку
+    во временном B-дереве.
+    """
+    problems = []
+    for detail in explain(sql):
+        scan = FULL_SCAN.match(detail)
+        if scan and scan.group('table') in FEED_TABLES:
+            problems.append(detail)
+        if detail.startswith(TEMP_SORT) and detail.endswith(SORT_CLAUSES):
+            problems.append(detail)
+    return problems
+
+
+@override_settings(**DISABLE_CACHING)
+class FeedQueryPlanTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.author = User.objects.create_user(username='author')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=TEST_GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+        for author in (cls.user, cls.author):
+            for num in range(15):
+                Post.objects.create(
+                    text=f'Тестовый пост {num}',
+                    group=cls.group if num % 2 else None,
+                    author=author,
+                )
+        cls.post = Post.objects.filter(author=cls.user).first()
+        cls.post_to_delete = Post.objects.filter(author=cls.user).last()
+        Comment.objects.bulk_create([
+            Comment(post=cls.post, author=cls.author,
+                    text=f'Комментарий {num}')
+            for num in range(15)
+        ])
+
+    def setUp(self):
+        self.auth_client = Client()
+        self.auth_client.force_login(FeedQueryPlanTests.user)
+
+    def get_urls(self) -> dict:
+        kwargs = {
+            'slug': FeedQueryPlanTests.group.slug,
+            'username': FeedQueryPlanTests.author.username,
+            'post_id': FeedQueryPlanTests.post.pk,
+        }
+        urls = {}
+        for pattern in urlpatterns:
+            name = f'{app_name}:{pattern.name}'
+            url_kwargs = {key: kwargs[key]
+                          for key in pattern.pattern.converters}
+            if pattern.name == 'post_delete':
+                url_kwargs['post_id'] = FeedQueryPlanTests.post_to_delete.pk
+            urls[name] = reverse(name, kwargs=url_kwargs)
+        return urls
+
+    def test_views_do_not_scan_feed_tables(self):
+        """Запросы страниц не просматривают таблицы ленты целиком
+        и не сортируют результат во временном B-дереве."""
+        for name, url in self.get_urls().items():
+            with self.subTest(view=name):
+                with CaptureQueriesContext(connection) as queries:
+                    self.auth_client.get(url)
+                for query in queries.captured_queries:
+                    sql = query['sql']
+                    if not sql.startswith('SELECT'):
+                        continue
+                    self.assertEqual(plan_problems(sql), [], sql)
+
+    def test_plan_problems_detects_scan_and_sort(self):
+        """Проверка плана замечает полный просмотр и сортировку."""
+        problems = plan_problems(
+            'SELECT "id" FROM "posts_post" ORDER BY "text"')
+        self.assertEqual(len(problems), 2)
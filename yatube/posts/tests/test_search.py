@@ -0,0 +1,84 @@
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import search
+from ..models import Post, User
+from ..settings import DEFAULT_AMOUNT_POSTS_ON_PAGE
+from . import DISABLE_CACHING, TEST_USERNAME_AUTH
+
+
+@override_settings(**DISABLE_CACHING)
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.in_text = Post.objects.create(
+            title='Про погоду', text='Сегодня в горах шёл снег',
+            author=cls.user)
+        cls.in_title = Post.objects.create(
+            title='Горы зимой', text='Заметки о походе',
+            author=cls.user)
+        cls.other = Post.objects.create(
+            title='Рецепт', text='Блины на завтрак', author=cls.user)
+
+    def search(self, query, **params):
+        return Client().get(reverse('posts:search'), {'q': query, **params})
+
+    def test_ranked_prefix_search(self):
+        """Ищутся формы слова по префиксу, совпадение в заголовке выше."""
+        response = self.search('гор')
+        self.assertEqual(
+            list(response.context.get('page_obj')),
+            [SearchTests.in_title, SearchTests.in_text])
+
+    def test_query_syntax_is_escaped(self):
+        """Операторы FTS5 в запросе не ломают поиск."""
+        for query in ('"', 'гор*', 'NEAR(', 'снег - OR', ''):
+            with self.subTest(query=query):
+                response = self.search(query)
+                self.assertEqual(response.status_code, 200)
+
+    def test_index_follows_post_changes(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.get(pk=SearchTests.other.pk)
+        post.text = 'Оладьи на завтрак'
+        post.save()
+        self.assertEqual(list(search.search('оладьи')), [post])
+        self.assertFalse(search.search('блины').exists())
+        post.delete()
+        self.assertFalse(search.search('оладьи').exists())
+
+    def test_rebuild(self):
+        """Команда перестраивает индекс по постам."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {search.SEARCH_TABLE}')
+        self.assertFalse(search.search('блины').exists())
+        with mock.patch('posts.search.SEARCH_BATCH_SIZE', 2):
+            call_command('rebuild_search_index', stdout=mock.Mock())
+        self.assertEqual(list(search.search('блины')), [SearchTests.other])
+
+    def test_paginator_keeps_query(self):
+        """Ссылки пагинатора сохраняют поисковый запрос."""
+        Post.objects.bulk_create([
+            Post(text=f'Снег {num}', author=SearchTests.user)
+            for num in range(DEFAULT_AMOUNT_POSTS_ON_PAGE)
+        ])
+        search.rebuild()
+        response = self.search('снег')
+        self.assertContains(response, '?q=%D1%81%D0%BD%D0%B5%D0%B3&amp;page=2')
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке идёт по тому же индексу."""
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+        client = Client()
+        client.force_login(admin)
+        response = client.get(reverse('admin:posts_post_changelist'),
+                              {'q': 'блин'})
+        self.assertEqual(list(response.context['cl'].result_list),
+                         [SearchTests.other])
@@ -0,0 +1,81 @@
+import io
+import shutil
+import tempfile
+from collections import Counter
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from .. import seed
+from ..models import AuthorStats, Comment, Follow, Group, Post, User
+from . import DISABLE_CACHING
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+VOLUMES = dict(users=30, groups=4, posts=200, follows=100, comments=300)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, **DISABLE_CACHING)
+class SeedTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def snapshot(self):
+        """Содержимое базы без учёта сдвига первичных ключей."""
+        user_offset = User.objects.order_by('pk').first().pk
+        return [
+            (title, text, author_id - user_offset)
+            for title, text, author_id in Post.objects.order_by('pk')
+            .values_list('title', 'text', 'author_id')
+        ]
+
+    def test_volumes_and_derived_data(self):
+        """Создаются заказанные объёмы, счётчики и индексы
+        перестраиваются."""
+        call_command('seed', **VOLUMES, image_share=0.5,
+                     stdout=io.StringIO())
+        self.assertEqual(User.objects.count(), VOLUMES['users'])
+        self.assertEqual(Group.objects.count(), VOLUMES['groups'])
+        self.assertEqual(Post.objects.count(), VOLUMES['posts'])
+        self.assertEqual(Comment.objects.count(), VOLUMES['comments'])
+        self.assertEqual(Follow.objects.count(), VOLUMES['follows'])
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            VOLUMES['posts'])
+        self.assertFalse(
+            Comment.objects.filter(created__lt=F('post__pub_date')).exists())
+        image_post = Post.objects.filter(has_image=True).first()
+        self.assertTrue(default_storage.exists(image_post.image.name))
+        # После явных pk обычное создание не конфликтует
+        Post.objects.create(text='Новый', author=User.objects.first())
+
+    def test_skew(self):
+        """Горячие авторы собирают заметно больше постов, чем средний."""
+        seed.seed(**VOLUMES)
+        per_author = Counter(Post.objects.values_list('author_id',
+                                                      flat=True))
+        top = per_author.most_common(1)[0][1]
+        self.assertGreater(top, 3 * VOLUMES['posts'] / VOLUMES['users'])
+
+    def test_deterministic_per_seed(self):
+        """Одинаковое зерно даёт одинаковые данные, другое — другие."""
+        seed.seed(**VOLUMES, seed=7)
+        first = self.snapshot()
+        User.objects.all().delete()
+        Group.objects.all().delete()
+        seed.seed(**VOLUMES, seed=7)
+        self.assertEqual(self.snapshot(), first)
+        User.objects.all().delete()
+        seed.seed(**VOLUMES, seed=8)
+        self.assertNotEqual(self.snapshot(), first)
+
+    def test_invalid_volumes(self):
+        """Противоречивые объёмы отклоняются до записи."""
+        with self.assertRaises(CommandError):
+            call_command('seed', users=0, posts=10, stdout=io.StringIO())
+        self.assertFalse(Post.objects.exists())
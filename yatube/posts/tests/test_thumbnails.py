@@ -0,0 +1,151 @@
+import shutil
+import tempfile
+from unittest import mock
+
+from django.conf import settings
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .. import images, thumbnails
+from ..models import Post, User
+from . import DISABLE_CACHING, TEST_USERNAME_AUTH, UPLOADED_IMAGE
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def uploaded_image(name='thumb.gif'):
+    UPLOADED_IMAGE.seek(0)
+    return SimpleUploadedFile(name=name, content=UPLOADED_IMAGE.read(),
+                              content_type='image/gif')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, **DISABLE_CACHING)
+class ThumbnailsTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.post = Post.objects.create(text='Пост с картинкой',
+                                       author=cls.user,
+                                       image=uploaded_image())
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_templates_show_placeholder_until_generated(self):
+        """Пока миниатюр нет, шаблоны выводят заглушку, а не создают их."""
+        post = ThumbnailsTests.post
+        url = reverse('posts:post_detail', kwargs={'post_id': post.pk})
+        self.assertIsNone(thumbnails.existing_thumbnail(post.image, 'detail'))
+        response = Client().get(url)
+        self.assertContains(response, '--bs-aspect-ratio')
+        self.assertIsNone(thumbnails.existing_thumbnail(post.image, 'detail'))
+
+        thumbnails.generate_for_post(post.pk)
+        thumbnail = thumbnails.existing_thumbnail(post.image, 'detail')
+        self.assertIsNotNone(thumbnail)
+        self.assertTrue(thumbnail.exists())
+        response = Client().get(url)
+        self.assertContains(response, thumbnail.url)
+
+    def test_feed_image_has_srcset(self):
+        """Карточка выводит srcset из всех вариантов и ленивую загрузку."""
+        post = ThumbnailsTests.post
+        thumbnails.generate_for_post(post.pk)
+        response = Client().get(
+            reverse('posts:profile', kwargs={'username': TEST_USERNAME_AUTH}))
+        for width in thumbnails.SRCSET_WIDTHS['card']:
+            variant = thumbnails.existing_thumbnail(post.image, 'card', width)
+            with self.subTest(width=width):
+                self.assertContains(response, f'{variant.url} {width}w')
+        self.assertContains(response, 'loading="lazy"')
+        self.assertContains(response, 'width="960" height="340"')
+
+    # Исходник общего поста нужен остальным тестам: откат транзакции
+    # не вернул бы удалённый файл
+    @mock.patch('posts.images.KEEP_ORIGINAL_IMAGES', True)
+    def test_command_generates_all_specs(self):
+        """Команда создаёт миниатюры всех размеров."""
+        call_command('generate_thumbnails', workers=1, stdout=mock.Mock())
+        image = Post.objects.get(pk=ThumbnailsTests.post.pk).image
+        for spec, widths in thumbnails.SRCSET_WIDTHS.items():
+            for width in widths:
+                with self.subTest(spec=spec, width=width):
+                    self.assertIsNotNone(
+                        thumbnails.existing_thumbnail(image, spec, width))
+
+    @mock.patch('posts.images.KEEP_ORIGINAL_IMAGES', True)
+    def test_command_normalizes_missed_images(self):
+        """Команда нормализует изображения, пропущенные фоновой
+        обработкой, и создаёт миниатюры уже из них."""
+        with mock.patch('posts.signals.run_in_background'):
+            post = Post.objects.create(text='Пост без обработки',
+                                       author=ThumbnailsTests.user,
+                                       image=uploaded_image('missed.gif'))
+        original = post.image.name
+        call_command('generate_thumbnails', workers=1, stdout=mock.Mock())
+        post.refresh_from_db()
+        self.assertNotEqual(post.image.name, original)
+        self.assertIsNotNone(
+            thumbnails.existing_thumbnail(post.image, 'card'))
+
+    def test_job_queued_only_for_new_image(self):
+        """Задача ставится при новом изображении, но не при правке текста."""
+        with mock.patch('posts.signals.run_in_background') as run:
+            post = Post.objects.create(text='Ещё пост',
+                                       author=ThumbnailsTests.user,
+                                       image=uploaded_image('other.gif'))
+            run.assert_any_call(images.process_post_image, post.pk)
+            run.reset_mock()
+            post = Post.objects.get(pk=post.pk)
+            post.text = 'Изменённый пост'
+            post.save()
+            run.assert_not_called()
+            post.image = uploaded_image('replaced.gif')
+            post.save()
+            run.assert_called_once_with(images.process_post_image, post.pk)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, **DISABLE_CACHING)
+class ThumbnailResolverTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.auth_client = Client()
+        self.auth_client.force_login(ThumbnailResolverTests.user)
+
+    def create_posts(self, amount):
+        for num in range(amount):
+            post = Post.objects.create(text=f'Пост {num}',
+                                       author=ThumbnailResolverTests.user,
+                                       image=uploaded_image(f'img{num}.gif'))
+            thumbnails.generate_for_post(post.pk)
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as context:
+            response = self.auth_client.get(url)
+        self.assertContains(response, '/cache/')
+        return len(context)
+
+    def test_page_thumbnails_resolved_in_one_query(self):
+        """Число запросов не зависит от числа изображений на странице."""
+        url = reverse('posts:profile',
+                      kwargs={'username': TEST_USERNAME_AUTH})
+        self.create_posts(1)
+        expected = self.count_queries(url)
+        self.create_posts(4)
+        self.assertEqual(self.count_queries(url), expected)
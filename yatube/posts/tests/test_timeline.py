@@ -0,0 +1,121 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import Client, TestCase
+
+from ..models import Follow, Post, TimelineEntry, User
+from .. import timeline
+from . import REVERSE_CASH, RUN_TASKS_INLINE, TEST_USERNAME_AUTH
+
+
+@RUN_TASKS_INLINE
+class TimelineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.author = User.objects.create_user(username='author')
+        cls.posts = [
+            Post.objects.create(text=f'Тестовый пост {num}',
+                                author=cls.author)
+            for num in range(3)
+        ]
+
+    def setUp(self):
+        self.auth_client = Client()
+        self.auth_client.force_login(TimelineTests.user)
+
+    def test_follow_backfills_timeline(self):
+        """Подписка добавляет в ленту уже опубликованные посты автора."""
+        Follow.objects.create(user=TimelineTests.user,
+                              author=TimelineTests.author)
+        response = self.auth_client.get(REVERSE_CASH.get('posts:follow_index'))
+        self.assertEqual(response.context.get('page_obj').object_list,
+                         TimelineTests.posts[::-1])
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост автора попадает в ленту подписчика."""
+        Follow.objects.create(user=TimelineTests.user,
+                              author=TimelineTests.author)
+        post = Post.objects.create(text='Новый пост',
+                                   author=TimelineTests.author)
+        self.assertTrue(TimelineEntry.objects.filter(
+            user=TimelineTests.user, post=post).exists())
+
+    def test_unfollow_and_delete_prune_timeline(self):
+        """Отписка и удаление поста убирают записи из ленты."""
+        follow = Follow.objects.create(user=TimelineTests.user,
+                                       author=TimelineTests.author)
+        post = Post.objects.create(text='Удаляемый пост',
+                                   author=TimelineTests.author)
+        post.delete()
+        self.assertFalse(TimelineEntry.objects.filter(post=post.pk).exists())
+        follow.delete()
+        self.assertFalse(
+            TimelineEntry.objects.filter(user=TimelineTests.user).exists())
+
+    def test_timeline_is_capped(self):
+        """Лента пользователя не превышает заданного размера."""
+        with mock.patch('posts.timeline.TIMELINE_MAX_ENTRIES', 2):
+            Follow.objects.create(user=TimelineTests.user,
+                                  author=TimelineTests.author)
+            self.assertEqual(
+                TimelineEntry.objects.filter(
+                    user=TimelineTests.user).count(), 2)
+            post = Post.objects.create(text='Новый пост',
+                                       author=TimelineTests.author)
+        self.assertEqual(
+            list(TimelineEntry.objects.filter(user=TimelineTests.user)
+                 .values_list('post', flat=True)),
+            [post.pk, TimelineTests.posts[-1].pk])
+
+    def test_fan_out_runs_in_background(self):
+        """Пост раскладывается по лентам в фоне, а не в запросе."""
+        with mock.patch('posts.signals.run_in_background') as run:
+            post = Post.objects.create(text='Новый пост',
+                                       author=TimelineTests.author)
+        run.assert_any_call(timeline.fan_out, post.pk)
+
+    def test_trim_caps_all_timelines_at_once(self):
+        """Ленты нескольких пользователей обрезаются одним запросом."""
+        readers = [User.objects.create_user(username=f'reader{num}')
+                   for num in range(3)]
+        for reader in readers:
+            Follow.objects.create(user=reader, author=TimelineTests.author)
+        with mock.patch('posts.timeline.TIMELINE_MAX_ENTRIES', 1):
+            with self.assertNumQueries(1):
+                timeline.trim(*(reader.pk for reader in readers))
+        for reader in readers:
+            with self.subTest(reader=reader.username):
+                self.assertEqual(
+                    list(TimelineEntry.objects.filter(user=reader)
+                         .values_list('post', flat=True)),
+                    [TimelineTests.posts[-1].pk])
+
+    def test_fan_out_of_deleted_post(self):
+        """Фоновая раскладка удалённого к тому времени поста ничего
+        не делает."""
+        Follow.objects.create(user=TimelineTests.user,
+                              author=TimelineTests.author)
+        timeline.fan_out(0)
+        self.assertEqual(
+            TimelineEntry.objects.filter(user=TimelineTests.user).count(),
+            len(TimelineTests.posts))
+
+    def test_rebuild_restores_capped_timelines(self):
+        """Команда rebuild_timeline восстанавливает ленты всех
+        подписчиков с учётом ограничения размера."""
+        readers = [User.objects.create_user(username=f'reader{num}')
+                   for num in range(3)]
+        for reader in readers:
+            Follow.objects.create(user=reader, author=TimelineTests.author)
+        TimelineEntry.objects.all().delete()
+        with mock.patch('posts.timeline.TIMELINE_MAX_ENTRIES', 2):
+            call_command('rebuild_timeline', stdout=StringIO())
+        for reader in readers:
+            with self.subTest(reader=reader.username):
+                self.assertEqual(
+                    list(TimelineEntry.objects.filter(user=reader)
+                         .values_list('post', flat=True)),
+                    [post.pk for post in TimelineTests.posts[:0:-1]])
@@ -0,0 +1,98 @@
+import datetime
+import io
+import json
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import search
+from ..models import AuthorStats, Comment, Follow, Group, Post, User
+from . import DISABLE_CACHING
+
+
+@override_settings(**DISABLE_CACHING)
+class TransferTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        cls.pub_date = timezone.now() - datetime.timedelta(days=30)
+        cls.posts = []
+        for num in range(5):
+            post = Post.objects.create(
+                text=f'Переносимый пост {num}', author=cls.author,
+                group=cls.group if num % 2 else None)
+            cls.posts.append(post)
+        Post.objects.update(pub_date=cls.pub_date)
+        Comment.objects.create(post=cls.posts[0], author=cls.reader,
+                               text='Комментарий')
+        Follow.objects.create(user=cls.reader, author=cls.author)
+
+    def export(self, stderr=None):
+        output = io.StringIO()
+        call_command('export_content', stdout=output,
+                     stderr=stderr or io.StringIO())
+        return output.getvalue()
+
+    def test_export_summary_goes_to_stderr(self):
+        """Сводка выгрузки пишется в stderr команды, а не в JSONL."""
+        stderr = io.StringIO()
+        dump = self.export(stderr)
+        self.assertIn('Выгружено', stderr.getvalue())
+        self.assertNotIn('Выгружено', dump)
+
+    def test_export_is_jsonl(self):
+        """Выгрузка — по объекту JSON на строку, в порядке зависимостей."""
+        models = [json.loads(line)['model']
+                  for line in self.export().splitlines()]
+        self.assertEqual(models, ['group'] + ['post'] * 5
+                         + ['comment', 'follow'])
+
+    def test_round_trip_into_empty_database(self):
+        """Загрузка в пустую базу восстанавливает связи и производные
+        данные."""
+        dump = self.export()
+        Group.objects.all().delete()
+        User.objects.all().delete()
+        with mock.patch('posts.management.commands.import_content.open',
+                        return_value=io.StringIO(dump), create=True):
+            call_command('import_content', 'dump.jsonl', batch_size=2,
+                         stdout=io.StringIO())
+
+        author = User.objects.get(username='author')
+        reader = User.objects.get(username='reader')
+        group = Group.objects.get(slug='group')
+        self.assertEqual(author.posts.count(), 5)
+        self.assertTrue(all(post.pub_date == TransferTests.pub_date
+                            for post in author.posts.all()))
+        self.assertEqual(group.groups.count(), 2)
+        comment = Comment.objects.get()
+        self.assertEqual(comment.author, reader)
+        self.assertEqual(comment.post.text, 'Переносимый пост 0')
+        self.assertTrue(Follow.objects.filter(user=reader,
+                                              author=author).exists())
+
+        self.assertEqual(AuthorStats.objects.get(user=author).posts_count, 5)
+        self.assertEqual(Group.objects.get(slug='group').posts_count, 2)
+        self.assertEqual(comment.post.comments_count, 1)
+        self.assertEqual(reader.timeline.count(), 5)
+        self.assertEqual(search.search('переносимый').count(), 5)
+
+    def test_import_next_to_existing_content(self):
+        """Повторная загрузка добавляет посты с новыми pk, не дублируя
+        группы и подписки."""
+        dump = self.export()
+        with mock.patch('posts.management.commands.import_content.open',
+                        return_value=io.StringIO(dump), create=True):
+            call_command('import_content', 'dump.jsonl',
+                         stdout=io.StringIO())
+        self.assertEqual(Post.objects.count(), 10)
+        self.assertEqual(Group.objects.count(), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(Comment.objects.filter(
+            post__pk__gt=TransferTests.posts[-1].pk).count(), 1)
@@ -2,6 +2,7 @@ import datetime
 import shutil
 import tempfile
 from http import HTTPStatus
+from unittest import mock
 
 from django import forms
 from django.conf import settings
@@ -10,10 +11,14 @@ from django.test import Client, TestCase, override_settings
 from django.urls import reverse
 from django.utils import timezone
 
-from ..models import Follow, Group, Post, User
-from ..settings import DEFAULT_AMOUNT_POSTS_ON_PAGE
-from . import (REVERSE_CASH, TEST_GROUP_SLUG,
-               TEST_USERNAME_AUTH, UPLOADED_IMAGE, DISABLE_CACHING)
+from core.tests import execute_on_commit
+from .. import carousel
+from ..generations import INDEX_FEED, feed_generation
+from ..models import Comment, Follow, Group, Post, User
+from ..settings import COMMENTS_PER_PAGE, DEFAULT_AMOUNT_POSTS_ON_PAGE
+from . import (GARBAGE_CURSORS, REVERSE_CASH, RUN_TASKS_INLINE,
+               TEST_GROUP_SLUG, TEST_USERNAME_AUTH, UPLOADED_IMAGE,
+               DISABLE_CACHING)
 
 TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
 
@@ -242,18 +247,50 @@ class CacheTests(TestCase):
         Post.objects.bulk_update(cls.posts, ['pub_date'])
 
     def setUp(self):
+        cache.clear()
         self.guest_client = Client()
         response = self.guest_client.get(REVERSE_CASH.get('posts:index'))
         self.expected_content = response.content
 
     def test_first_index_page_cache(self):
         """Проверяем, что кеширование первой страницы index работает."""
-        CacheTests.posts[-1].delete()
+        # Обновление мимо сигналов не сбрасывает кеш
+        Post.objects.filter(pk=CacheTests.posts[-1].pk).update(
+            text='Изменённый пост')
         response = self.guest_client.get(REVERSE_CASH.get('posts:index'))
         self.assertEqual(response.content, self.expected_content)
-        cache.clear()
+
+    def test_index_page_cache_invalidated_on_delete(self):
+        """Удаление поста сразу сбрасывает кеш ленты."""
+        with execute_on_commit():
+            CacheTests.posts[-1].delete()
         response = self.guest_client.get(REVERSE_CASH.get('posts:index'))
         self.assertNotEqual(response.content, self.expected_content)
+        self.assertNotContains(response, CacheTests.posts[-1].text)
+
+    def test_index_page_cache_invalidated_on_author_rename(self):
+        """Смена имени автора сбрасывает кеш всех лент."""
+        author = User.objects.get(username=TEST_USERNAME_AUTH)
+        author.first_name = 'Переименованный'
+        with execute_on_commit():
+            author.save()
+        response = self.guest_client.get(REVERSE_CASH.get('posts:index'))
+        self.assertContains(response, 'Переименованный')
+
+    def test_generations_bumped_after_commit(self):
+        """Поколение ленты меняется только после фиксации транзакции."""
+        version = feed_generation(INDEX_FEED)
+        with execute_on_commit():
+            CacheTests.posts[-1].save()
+            self.assertEqual(feed_generation(INDEX_FEED), version)
+        self.assertNotEqual(feed_generation(INDEX_FEED), version)
+
+    def test_index_page_cache_not_invalidated_on_login(self):
+        """Вход пользователя не сбрасывает кеш лент."""
+        version = feed_generation(INDEX_FEED)
+        self.guest_client.force_login(
+            User.objects.get(username=TEST_USERNAME_AUTH))
+        self.assertEqual(feed_generation(INDEX_FEED), version)
 
     def test_second_index_page_cache(self):
         """Проверяем, что на второй странице не выводится кеш первой."""
@@ -262,6 +299,129 @@ class CacheTests(TestCase):
         self.assertNotEqual(response.content, self.expected_content)
 
 
+class PageCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=TEST_GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый пост',
+            group=cls.group,
+            author=cls.author,
+        )
+        cls.urls = (
+            REVERSE_CASH.get('posts:index'),
+            REVERSE_CASH.get('posts:group_list.test_kwargs'),
+            REVERSE_CASH.get('posts:profile.test_kwargs'),
+            reverse('posts:post_detail', kwargs={'post_id': cls.post.pk}),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_anonymous_page_served_from_cache(self):
+        """Повторный анонимный запрос не выполняет запросов ленты."""
+        for url in PageCacheTests.urls:
+            with self.subTest(url=url):
+                self.guest_client.get(url)
+                # Остаётся только поиск объекта для ключа страницы
+                with self.assertNumQueries(0 if url == '/' else 1):
+                    response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_page_cache_keyed_by_query_string(self):
+        """Разные страницы пагинатора кешируются отдельно."""
+        self.guest_client.get(REVERSE_CASH.get('posts:index'))
+        with self.assertNumQueries(0):
+            self.guest_client.get(REVERSE_CASH.get('posts:index'))
+        response = self.guest_client.get(
+            REVERSE_CASH.get('posts:index'), {'page': 2})
+        self.assertTrue(response.context)
+
+    def test_page_cache_purged_on_write(self):
+        """Изменения поста и комментарии сразу видны на страницах."""
+        for url in PageCacheTests.urls:
+            self.guest_client.get(url)
+        post = PageCacheTests.post
+        post.text = 'Изменённый пост'
+        with execute_on_commit():
+            post.save()
+        for url in PageCacheTests.urls:
+            with self.subTest(url=url):
+                self.assertContains(self.guest_client.get(url),
+                                    'Изменённый пост')
+        detail_url = PageCacheTests.urls[-1]
+        with execute_on_commit():
+            Comment.objects.create(post=post, author=PageCacheTests.author,
+                                   text='Новый комментарий')
+        self.assertContains(self.guest_client.get(detail_url),
+                            'Новый комментарий')
+
+    def test_page_cache_bypassed_with_session(self):
+        """Посетители с сессией получают страницу без кеша."""
+        url = REVERSE_CASH.get('posts:index')
+        self.guest_client.get(url)
+        auth_client = Client()
+        auth_client.force_login(PageCacheTests.author)
+        response = auth_client.get(url)
+        self.assertTrue(response.context)
+        self.assertTrue(response.context.get('user').is_authenticated)
+
+
+class ConditionalGetTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.author)
+        cls.urls = (
+            REVERSE_CASH.get('posts:index'),
+            REVERSE_CASH.get('posts:profile.test_kwargs'),
+            reverse('posts:post_detail', kwargs={'post_id': cls.post.pk}),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_not_modified(self):
+        """Неизменившаяся страница отдаётся как 304 без рендеринга."""
+        for url in ConditionalGetTests.urls:
+            with self.subTest(url=url):
+                etag = self.guest_client.get(url)['ETag']
+                # Остаётся только поиск объекта для версий страницы
+                with self.assertNumQueries(0 if url == '/' else 1):
+                    response = self.guest_client.get(
+                        url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.NOT_MODIFIED)
+                self.assertFalse(response.content)
+
+    def test_etag_changes_on_write(self):
+        """После изменения поста ETag перестаёт совпадать."""
+        etags = {url: self.guest_client.get(url)['ETag']
+                 for url in ConditionalGetTests.urls}
+        with execute_on_commit():
+            ConditionalGetTests.post.save()
+        for url, etag in etags.items():
+            with self.subTest(url=url):
+                response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_no_etag_for_authenticated(self):
+        """Авторизованным пользователям ETag не выдаётся."""
+        auth_client = Client()
+        auth_client.force_login(ConditionalGetTests.author)
+        response = auth_client.get(REVERSE_CASH.get('posts:index'))
+        self.assertFalse(response.has_header('ETag'))
+
+
 @override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
 class CreatePostTests(TestCase):
     @classmethod
@@ -423,6 +583,7 @@ class FollowTests(TestCase):
             FollowTests.user.follower.filter(
                 user=FollowTests.user, author=FollowTests.author).exists())
 
+    @RUN_TASKS_INLINE
     def test_follow_index(self):
         """Новая запись пользователя появляется в ленте тех,
         кто на него подписан и не появляется в ленте тех, кто не подписан."""
@@ -445,6 +606,22 @@ class FollowTests(TestCase):
         self.assertEqual(
             len(response.context.get('page_obj').object_list), 0)
 
+    @RUN_TASKS_INLINE
+    def test_follow_index_ignores_garbage_cursor(self):
+        """Битый курсор в ленте подписок открывает первую страницу."""
+        Follow.objects.create(
+            user=FollowTests.user, author=FollowTests.author)
+        post = Post.objects.create(
+            text='Тестовый пост', author=FollowTests.author)
+        for cursor in GARBAGE_CURSORS:
+            with self.subTest(cursor=cursor):
+                response = self.auth_client.get(
+                    FollowTests.rev_cash.get('posts:follow_index'),
+                    {'cursor': cursor})
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(
+                    response.context.get('page_obj').object_list, [post, ])
+
     def test_user_cannot_subscribe_to_himself(self):
         """Пользователь не может подписаться на самого себя."""
         amount_follower = FollowTests.user.follower.count()
@@ -497,3 +674,158 @@ class FollowTests(TestCase):
             f'{FollowTests.rev_cash.get("posts:profile_unfollow.author")}')
         self.assertEqual(FollowTests.user.follower.count(),
                          amount_follower)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class CarouselTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        Post.objects.bulk_create([
+            Post(text=f'Тестовый пост {num}', author=cls.user)
+            for num in range(5)
+        ])
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    # Обработка изображения не влияет на баннер, а поток задачи не видит
+    # незафиксированную транзакцию теста
+    @mock.patch('posts.signals.run_in_background', mock.Mock())
+    def test_carousel_shows_only_posts_with_image(self):
+        """Баннер состоит из постов с изображением и обновляется
+        при их создании, редактировании и удалении."""
+        index = REVERSE_CASH.get('posts:index')
+        response = self.guest_client.get(index)
+        self.assertEqual(response.context.get('posts_with_img'), [])
+
+        with execute_on_commit():
+            post = Post.objects.create(text='Пост с картинкой',
+                                       author=CarouselTests.user,
+                                       image=UPLOADED_IMAGE)
+        response = self.guest_client.get(index)
+        self.assertEqual(response.context.get('posts_with_img'), [post])
+
+        post.image = None
+        with execute_on_commit():
+            post.save()
+        response = self.guest_client.get(index)
+        self.assertEqual(response.context.get('posts_with_img'), [])
+
+    def test_carousel_is_cached(self):
+        """Баннер не запрашивается из базы при повторных показах."""
+        carousel.get_posts()
+        with self.assertNumQueries(0):
+            carousel.get_posts()
+
+
+@override_settings(**DISABLE_CACHING)
+class FeedQueryCountTests(TestCase):
+    # Сессия, пользователь, два пункта меню и запросы самой ленты
+    expected_queries = {
+        'posts:index': 7,
+        'posts:group_list.test_kwargs': 7,
+        'posts:profile.test_kwargs': 8,
+        'posts:follow_index': 5,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=TEST_GROUP_SLUG,
+            description='Тестовое описание',
+        )
+        Follow.objects.create(user=cls.user, author=cls.author)
+
+    def setUp(self):
+        self.auth_client = Client()
+        self.auth_client.force_login(FeedQueryCountTests.user)
+
+    def create_posts(self, amount):
+        for num in range(amount):
+            Post.objects.create(
+                text=f'Тестовый пост {num}',
+                group=FeedQueryCountTests.group,
+                author=FeedQueryCountTests.author,
+            )
+
+    def test_feed_query_count_does_not_depend_on_posts(self):
+        """Количество запросов ленты не зависит от числа постов."""
+        for amount in (1, DEFAULT_AMOUNT_POSTS_ON_PAGE):
+            self.create_posts(amount)
+            for name, expected in self.expected_queries.items():
+                with self.subTest(amount=amount, page=name):
+                    with self.assertNumQueries(expected):
+                        self.auth_client.get(REVERSE_CASH.get(name))
+
+
+@override_settings(**DISABLE_CACHING)
+class CommentsPaginationTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=TEST_USERNAME_AUTH)
+        cls.post = Post.objects.create(text='Тестовый пост', author=cls.user)
+        Comment.objects.bulk_create([
+            Comment(post=cls.post,
+                    author=User.objects.create_user(username=f'user{num}'),
+                    text=f'Комментарий {num}')
+            for num in range(COMMENTS_PER_PAGE + 5)
+        ])
+        cls.comments = list(cls.post.comments.order_by('-created', '-pk'))
+
+    def test_post_detail_shows_first_batch(self):
+        """На странице поста выводится только первая пачка комментариев
+        за фиксированное число запросов."""
+        # Первый запрос ищет автора поста для ключа кеша страницы
+        with self.assertNumQueries(5):
+            response = Client().get(
+                reverse('posts:post_detail',
+                        kwargs={'post_id': CommentsPaginationTests.post.pk}))
+        comments_page = response.context.get('comments_page')
+        self.assertEqual(comments_page.object_list,
+                         CommentsPaginationTests.comments[:COMMENTS_PER_PAGE])
+        self.assertTrue(comments_page.has_next())
+
+    def test_comments_fragment_returns_next_batch(self):
+        """Фрагмент комментариев отдаёт следующую пачку."""
+        post_id = CommentsPaginationTests.post.pk
+        first_page = Client().get(
+            reverse('posts:post_detail', kwargs={'post_id': post_id})
+        ).context.get('comments_page')
+        response = Client().get(
+            reverse('posts:comments', kwargs={'post_id': post_id}),
+            {'cursor': first_page.next_cursor})
+        self.assertTemplateUsed(response, 'posts/includes/comment_list.html')
+        self.assertEqual(response.context.get('comments_page').object_list,
+                         CommentsPaginationTests.comments[COMMENTS_PER_PAGE:])
+        self.assertNotContains(response, 'comments-more')
+
+    def test_comments_fragment_ignores_garbage_cursor(self):
+        """Битый курсор во фрагменте комментариев отдаёт первую пачку."""
+        url = reverse('posts:comments',
+                      kwargs={'post_id': CommentsPaginationTests.post.pk})
+        for cursor in GARBAGE_CURSORS:
+            with self.subTest(cursor=cursor):
+                response = Client().get(url, {'cursor': cursor})
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(
+                    response.context.get('comments_page').object_list,
+                    CommentsPaginationTests.comments[:COMMENTS_PER_PAGE])
+
+    def test_comments_fragment_of_missing_post(self):
+        """Фрагмент комментариев несуществующего поста возвращает 404."""
+        response = Client().get(
+            reverse('posts:comments', kwargs={'post_id': 0}))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
@@ -0,0 +1,170 @@
+"""
+Заранее подготовленные миниатюры изображений постов.
+
+Миниатюры создаются в фоне после загрузки изображения и командой
+generate_thumbnails, а шаблоны только читают уже готовые записи
+хранилища sorl.thumbnail и не запускают Pillow во время запроса.
+"""
+from typing import Dict, Optional, Tuple
+
+from django.utils import timezone
+from sorl.thumbnail import default, get_thumbnail
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from core.instrumentation import timed
+
+from . import generations
+from .models import Post
+
+# Имя набора: геометрия основного размера и параметры sorl.thumbnail
+THUMBNAIL_SPECS = {
+    'card': ('960x340', {'crop': 'center', 'upscale': True}),
+    'detail': ('960x339', {'crop': 'center', 'upscale': True}),
+    'carousel': ('1920x1080', {'crop': 'center', 'upscale': True}),
+}
+# Ширины вариантов для srcset, включая основной размер набора
+SRCSET_WIDTHS = {
+    'card': (480, 960),
+    'detail': (480, 960),
+    'carousel': (640, 1280, 1920),
+}
+# Атрибут sizes: карточки занимают левую колонку сетки, баннер — экран
+FEED_COLUMN_SIZES = ('(min-width: 1400px) 880px, (min-width: 1200px) 760px, '
+                     '(min-width: 992px) 640px, 100vw')
+SRCSET_SIZES = {
+    'card': FEED_COLUMN_SIZES,
+    'detail': FEED_COLUMN_SIZES,
+    'carousel': '100vw',
+}
+
+
+def spec_size(spec: str) -> Tuple[int, int]:
+    """Ширина и высота основного размера набора."""
+    width, height = THUMBNAIL_SPECS[spec][0].split('x')
+    return int(width), int(height)
+
+
+def variant_geometry(spec: str, width: int) -> str:
+    """Геометрия варианта той же пропорции, что и основной размер."""
+    spec_width, spec_height = spec_size(spec)
+    return f'{width}x{round(width * spec_height / spec_width)}'
+
+
+def _full_options(source: ImageFile, options: dict) -> dict:
+    """Дополняет параметры так же, как ThumbnailBackend.get_thumbnail."""
+    backend = default.backend
+    options = dict(options)
+    if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+        options.setdefault('format', backend._get_format(source))
+    for key, value in backend.default_options.items():
+        options.setdefault(key, value)
+    for key, attr in backend.extra_options:
+        value = getattr(thumbnail_settings, attr)
+        if value != getattr(default_settings, attr):
+            options.setdefault(key, value)
+    return options
+
+
+def thumbnail_file(image, spec: str, width: int = None) -> ImageFile:
+    """
+    Возвращает файл миниатюры, не обращаясь к исходному изображению.
+
+    Args:
+        image: Исходное изображение
+        spec: Имя набора из THUMBNAIL_SPECS
+        width: Ширина варианта; по умолчанию основной размер набора
+    """
+    geometry, options = THUMBNAIL_SPECS[spec]
+    if width is not None:
+        geometry = variant_geometry(spec, width)
+    source = ImageFile(image)
+    name = default.backend._get_thumbnail_filename(
+        source, geometry, _full_options(source, options))
+    return ImageFile(name, default.storage)
+
+
+def existing_thumbnail(image, spec: str,
+                       width: int = None) -> Optional[ImageFile]:
+    """Возвращает миниатюру, если она уже создана, иначе None."""
+    if not image:
+        return None
+    return default.kvstore.get(thumbnail_file(image, spec, width))
+
+
+def existing_variants(image, spec: str) -> Dict[int, Optional[ImageFile]]:
+    """Возвращает готовые варианты набора по ширинам одним запросом."""
+    if not image:
+        return {}
+    files = {width: thumbnail_file(image, spec, width)
+             for width in SRCSET_WIDTHS[spec]}
+    found = default.kvstore.get_many(files.values())
+    return {width: found[file.key] for width, file in files.items()}
+
+
+class ThumbnailResolver:
+    """
+    Находит готовые миниатюры всех изображений страницы разом.
+
+    Источники добавляются до рендеринга, а читаются лениво при первом
+    обращении к миниатюре своего размера: так страница не выполняет запрос
+    ленты ради миниатюр, если сама лента взята из кеша фрагмента.
+    """
+
+    def __init__(self):
+        self._sources = {}
+        self._resolved = {}
+
+    def add(self, posts, spec: str) -> 'ThumbnailResolver':
+        self._sources.setdefault(spec, []).append(posts)
+        return self
+
+    def _resolve(self, spec: str) -> None:
+        files = {}
+        for posts in self._sources.pop(spec, ()):
+            for post in posts:
+                if post.image:
+                    for width in SRCSET_WIDTHS[spec]:
+                        files[(post.image.name, width)] = thumbnail_file(
+                            post.image, spec, width)
+        with timed('thumbnails'):
+            found = default.kvstore.get_many(files.values())
+        for (name, width), image_file in files.items():
+            self._resolved.setdefault((name, spec), {})[width] = (
+                found[image_file.key])
+
+    def variants(self, image, spec: str) -> Dict[int, Optional[ImageFile]]:
+        """Возвращает готовые варианты изображения по ширинам."""
+        if not image:
+            return {}
+        if spec in self._sources:
+            self._resolve(spec)
+        try:
+            return self._resolved[(image.name, spec)]
+        except KeyError:
+            return existing_variants(image, spec)
+
+
+def aspect_ratio(spec: str) -> float:
+    """Отношение высоты к ширине миниатюры в процентах."""
+    width, height = spec_size(spec)
+    return round(height / width * 100, 2)
+
+
+def generate(image) -> None:
+    """Создаёт все варианты всех наборов миниатюр изображения."""
+    for spec, (geometry, options) in THUMBNAIL_SPECS.items():
+        for width in SRCSET_WIDTHS[spec]:
+            get_thumbnail(image, variant_geometry(spec, width), **options)
+
+
+def generate_for_post(post_id: int) -> None:
+    """Создаёт миниатюры поста и сбрасывает кеши страниц с заглушками."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    generate(post.image)
+    # Карточки с заглушкой закешированы под прежней версией поста
+    Post.objects.filter(pk=post_id).update(updated_at=timezone.now())
+    generations.bump_post_feeds(post)
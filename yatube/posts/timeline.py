@@ -0,0 +1,110 @@
+"""
+Материализованная лента подписок.
+
+Записи ленты создаются в фоне после публикации поста для всех подписчиков
+автора, дозаполняются при подписке и удаляются при отписке. Удаление поста
+чистит ленту каскадно. Размер ленты каждого пользователя ограничен
+TIMELINE_MAX_ENTRIES последними записями.
+"""
+from django.db import connection, transaction
+
+from .bulk import batches
+from .models import Follow, Post, TimelineEntry
+from .settings import TIMELINE_BATCH_SIZE, TIMELINE_MAX_ENTRIES
+
+
+def _table(model) -> str:
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _delete_overflow(condition: str = '', params: list = ()) -> None:
+    """
+    Удаляет записи сверх TIMELINE_MAX_ENTRIES одним запросом.
+
+    Лишние записи каждого пользователя находятся оконной функцией,
+    condition ограничивает выборку пользователей.
+    """
+    table = _table(TimelineEntry)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {table} WHERE id IN ('
+            f'SELECT id FROM ('
+            f'SELECT id, ROW_NUMBER() OVER ('
+            f'PARTITION BY user_id ORDER BY pub_date DESC, id DESC'
+            f') AS position FROM {table} {condition}'
+            f') AS ranked WHERE position > %s)',
+            [*params, TIMELINE_MAX_ENTRIES])
+
+
+def trim(*user_ids: int) -> None:
+    """Удаляет из лент пользователей записи сверх TIMELINE_MAX_ENTRIES."""
+    if not user_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(user_ids))
+    _delete_overflow(f'WHERE user_id IN ({placeholders})', user_ids)
+
+
+def fan_out(post_id: int) -> None:
+    """
+    Добавляет пост в ленты всех подписчиков автора.
+
+    Выполняется в фоне, поэтому пост к этому времени может быть уже
+    удалён.
+    """
+    post = Post.objects.filter(pk=post_id).only('author', 'pub_date').first()
+    if post is None:
+        return
+    follower_ids = (Follow.objects
+                    .filter(author_id=post.author_id)
+                    .values_list('user_id', flat=True)
+                    .iterator())
+    for batch in batches(follower_ids, TIMELINE_BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(user_id=user_id, post=post, pub_date=post.pub_date)
+             for user_id in batch],
+            ignore_conflicts=True,
+        )
+        trim(*batch)
+
+
+def backfill(user_id: int, author_id: int) -> None:
+    """Пачками добавляет в ленту пользователя последние посты автора."""
+    posts = (Post.objects
+             .filter(author_id=author_id)
+             .order_by('-pub_date')
+             .values_list('pk', 'pub_date')[:TIMELINE_MAX_ENTRIES]
+             .iterator())
+    for batch in batches(posts, TIMELINE_BATCH_SIZE):
+        TimelineEntry.objects.bulk_create(
+            [TimelineEntry(user_id=user_id, post_id=post_id, pub_date=pub_date)
+             for post_id, pub_date in batch],
+            ignore_conflicts=True,
+        )
+    trim(user_id)
+
+
+def prune(user_id: int, author_id: int) -> None:
+    """Удаляет из ленты пользователя все посты автора."""
+    TimelineEntry.objects.filter(
+        user_id=user_id, post__author_id=author_id).delete()
+
+
+@transaction.atomic
+def rebuild() -> None:
+    """
+    Перестраивает ленты всех пользователей по текущим подпискам.
+
+    Ленты заполняются одним запросом INSERT ... SELECT по соединению
+    подписок с постами и обрезаются одним запросом, без обхода подписок
+    по одной.
+    """
+    TimelineEntry.objects.all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {_table(TimelineEntry)} '
+            f'(user_id, post_id, pub_date) '
+            f'SELECT follow.user_id, post.id, post.pub_date '
+            f'FROM {_table(Follow)} AS follow '
+            f'JOIN {_table(Post)} AS post '
+            f'ON post.author_id = follow.author_id')
+    _delete_overflow()
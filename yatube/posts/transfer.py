@@ -0,0 +1,228 @@
+"""
+Перенос контента между окружениями в формате JSONL.
+
+Каждая строка — один объект с полем model. Группы, посты, комментарии и
+подписки выгружаются именно в этом порядке, поэтому при загрузке все
+ссылки уже разрешимы. Пользователи и группы связываются по username и
+slug, посты — по исходному pk, сдвинутому на наибольший pk базы на момент
+загрузки. Сдвиг не требует хранить таблицу соответствия в памяти.
+
+Загрузка пишет пачками через bulk_create без сигналов, а счётчики, ленты,
+поисковый индекс и кеши перестраиваются один раз в конце.
+"""
+import datetime
+import json
+from collections import Counter
+from itertools import groupby
+from typing import Iterable, TextIO
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.color import no_style
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import F, Max
+from django.utils.dateparse import parse_datetime
+
+from core.cache_versions import bump_version
+from core.context_processors.menu_item import MENU_VERSION
+
+from . import carousel, counters, generations, search, timeline
+from .bulk import batches
+from .models import Comment, Follow, Group, Post, User
+from .settings import TRANSFER_BATCH_SIZE
+
+GROUP = 'group'
+POST = 'post'
+COMMENT = 'comment'
+FOLLOW = 'follow'
+
+
+class _ContentEncoder(DjangoJSONEncoder):
+    def default(self, o):
+        # DjangoJSONEncoder отбрасывает микросекунды, а даты должны
+        # переноситься точно: по ним сортируются ленты
+        if isinstance(o, datetime.datetime):
+            return o.isoformat()
+        return super().default(o)
+
+
+def _export_querysets():
+    return (
+        (GROUP, Group.objects.values('slug', 'title', 'description')),
+        (POST, Post.objects.values(
+            'pk', 'title', 'text', 'pub_date', 'image',
+            author_username=F('author__username'),
+            group_slug=F('group__slug'))),
+        (COMMENT, Comment.objects.values(
+            'text', 'created', post_pk=F('post_id'),
+            author_username=F('author__username'))),
+        (FOLLOW, Follow.objects.values(
+            user_username=F('user__username'),
+            author_username=F('author__username'))),
+    )
+
+
+def export(stream: TextIO, batch_size: int = TRANSFER_BATCH_SIZE) -> Counter:
+    """
+    Выгружает контент в поток построчно.
+
+    Строки читаются курсором пачками по batch_size, поэтому память не
+    зависит от объёма базы.
+
+    Returns:
+        Число выгруженных объектов по типам
+    """
+    exported = Counter()
+    for model, queryset in _export_querysets():
+        rows = queryset.order_by('pk').iterator(chunk_size=batch_size)
+        for row in rows:
+            stream.write(json.dumps({'model': model, **row},
+                                    cls=_ContentEncoder,
+                                    ensure_ascii=False) + '\n')
+            exported[model] += 1
+    return exported
+
+
+def _user_ids(usernames: Iterable[str]) -> dict:
+    """
+    Возвращает id пользователей по username, создавая недостающих.
+
+    Созданные пользователи получают непригодный пароль: пароли не
+    переносятся, войти можно будет после сброса.
+    """
+    usernames = set(usernames)
+    ids = dict(User.objects.filter(username__in=usernames)
+               .values_list('username', 'pk'))
+    missing = usernames - ids.keys()
+    if missing:
+        User.objects.bulk_create(
+            [User(username=username, password=make_password(None))
+             for username in missing],
+            ignore_conflicts=True,
+        )
+        ids.update(User.objects.filter(username__in=missing)
+                   .values_list('username', 'pk'))
+    return ids
+
+
+def _group_ids(slugs: Iterable[str]) -> dict:
+    return dict(Group.objects.filter(slug__in=set(slugs) - {None})
+                .values_list('slug', 'pk'))
+
+
+def reset_sequences(*models) -> None:
+    """Сдвигает счётчики первичных ключей после вставки с явными pk."""
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(no_style(), models):
+            cursor.execute(sql)
+
+
+def rebuild_derived(timelines: bool = True) -> None:
+    """
+    Перестраивает всё, что выводится из основных таблиц.
+
+    Нужна после массовой записи мимо сигналов: счётчики, ленты подписок,
+    поисковый индекс, баннер и версии кешей.
+    """
+    counters.rebuild_all()
+    if timelines:
+        timeline.rebuild()
+    search.rebuild()
+    carousel.refresh()
+    generations.bump_all_feeds()
+    bump_version(MENU_VERSION)
+
+
+class Importer:
+    def __init__(self, batch_size: int = TRANSFER_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.imported = Counter()
+        self._post_offset = None
+
+    @property
+    def post_offset(self) -> int:
+        if self._post_offset is None:
+            self._post_offset = Post.objects.aggregate(
+                max_pk=Max('pk'))['max_pk'] or 0
+        return self._post_offset
+
+    def _import_groups(self, rows: list) -> int:
+        created = Group.objects.bulk_create(
+            [Group(slug=row['slug'], title=row['title'],
+                   description=row['description']) for row in rows],
+            ignore_conflicts=True,
+        )
+        return len(created)
+
+    def _import_posts(self, rows: list) -> int:
+        users = _user_ids(row['author_username'] for row in rows)
+        groups = _group_ids(row['group_slug'] for row in rows)
+        Post.objects.bulk_create([
+            Post(pk=self.post_offset + row['pk'],
+                 title=row['title'],
+                 text=row['text'],
+                 pub_date=parse_datetime(row['pub_date']),
+                 author_id=users[row['author_username']],
+                 group_id=groups.get(row['group_slug']),
+                 image=row['image'] or '',
+                 has_image=bool(row['image']))
+            for row in rows
+        ])
+        return len(rows)
+
+    def _import_comments(self, rows: list) -> int:
+        users = _user_ids(row['author_username'] for row in rows)
+        Comment.objects.bulk_create([
+            Comment(post_id=self.post_offset + row['post_pk'],
+                    author_id=users[row['author_username']],
+                    text=row['text'],
+                    created=parse_datetime(row['created']))
+            for row in rows
+        ])
+        return len(rows)
+
+    def _import_follows(self, rows: list) -> int:
+        users = _user_ids([row['user_username'] for row in rows]
+                          + [row['author_username'] for row in rows])
+        # Уже существующие подписки пропускаются
+        Follow.objects.bulk_create(
+            [Follow(user_id=users[row['user_username']],
+                    author_id=users[row['author_username']])
+             for row in rows],
+            ignore_conflicts=True,
+        )
+        return len(rows)
+
+    def load(self, lines: Iterable[str]) -> None:
+        """Загружает строки JSONL пачками, каждая в своей транзакции."""
+        handlers = {
+            GROUP: self._import_groups,
+            POST: self._import_posts,
+            COMMENT: self._import_comments,
+            FOLLOW: self._import_follows,
+        }
+        records = (json.loads(line) for line in lines if line.strip())
+        for model, model_records in groupby(records,
+                                            key=lambda row: row['model']):
+            handler = handlers[model]
+            for batch in batches(model_records, self.batch_size):
+                with transaction.atomic():
+                    self.imported[model] += handler(batch)
+
+    def finish(self) -> None:
+        """Перестраивает производные данные после загрузки."""
+        reset_sequences(Post)
+        rebuild_derived()
+
+
+def import_(stream: TextIO, batch_size: int = TRANSFER_BATCH_SIZE) -> Counter:
+    """
+    Загружает контент, выгруженный export.
+
+    Returns:
+        Число обработанных объектов по типам
+    """
+    importer = Importer(batch_size)
+    importer.load(stream)
+    importer.finish()
+    return importer.imported
@@ -68,6 +68,16 @@ urlpatterns = [
         views.add_comment,
         name='add_comment'
     ),
+    path(
+        'posts/<int:post_id>/comments/',
+        views.comments,
+        name='comments'
+    ),
+    path(
+        'search/',
+        views.search_posts,
+        name='search'
+    ),
     path(
         'create/',
         views.post_create,
@@ -1,21 +1,54 @@
 import os.path
 import random
+from typing import Union
 
 from django.contrib.auth.decorators import login_required, user_passes_test
 from django.core.handlers.wsgi import WSGIRequest
-from django.core.paginator import Paginator
+from django.core.paginator import Page
 from django.db.models import QuerySet
+from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.decorators import anonymous_etag, anonymous_page_cache
+
+from . import carousel, search
+from .feeds import post_feed, timeline_feed
 from .forms import CommentForm, PostForm
-from .models import Group, Post, User
-from .settings import DEFAULT_AMOUNT_POSTS_ON_PAGE
+from .generations import (INDEX_FEED, author_feed, feed_generation,
+                          group_feed, group_scopes, index_scopes,
+                          post_scopes, profile_scopes)
+from .models import Comment, Group, Post, User
+from .paginator import CursorPage, CursorPaginator, WindowedPaginator
+from .settings import COMMENTS_PER_PAGE, DEFAULT_AMOUNT_POSTS_ON_PAGE
+from .thumbnails import ThumbnailResolver
+
+
+def get_page_obj(request: WSGIRequest,
+                 object_list: QuerySet,
+                 keyset: bool = False) -> Union[Page, CursorPage]:
+    """
+    Возвращает страницу паджинатора по номеру или курсору из запроса.
+
+    Args:
+        request: Запрос
+        object_list: Все объекты
+        keyset: Использовать курсорную паджинацию по (pub_date, pk)
+    Returns:
+        Страница паджинатора
+    """
+    if keyset:
+        paginator = CursorPaginator(object_list, DEFAULT_AMOUNT_POSTS_ON_PAGE)
+        return paginator.get_page(request.GET.get('cursor'))
+    paginator = WindowedPaginator(object_list, DEFAULT_AMOUNT_POSTS_ON_PAGE)
+    page_number = request.GET.get('page')
+    return paginator.get_page(page_number)
 
 
 def render_page_with_paginator(request: WSGIRequest,
                                template: str,
                                post_list: QuerySet,
-                               additional_context: dict = None) -> render:
+                               additional_context: dict = None,
+                               keyset: bool = False) -> render:
     """
     Вызывает рендеринг объектов с шаблоном с применением паджинатора.
 
@@ -24,56 +57,64 @@ def render_page_with_paginator(request: WSGIRequest,
         template: Адрес шаблона
         post_list: Все объекты
         additional_context: Дополнительный контекст
+        keyset: Использовать курсорную паджинацию вместо номеров страниц
     Returns:
         Функция render
     """
-    paginator = Paginator(post_list, DEFAULT_AMOUNT_POSTS_ON_PAGE)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    context = {'page_obj': page_obj, }
+    context = {'page_obj': get_page_obj(request, post_list, keyset), }
     if additional_context:
         context.update(additional_context)
+    context.setdefault('thumbnail_resolver', ThumbnailResolver()).add(
+        context['page_obj'], 'card')
     return render(request, template, context)
 
 
+@anonymous_etag(index_scopes)
+@anonymous_page_cache(index_scopes)
 def index(request):
     template = 'posts/index.html'
     page_name = 'Последние обновления на сайте'
 
-    post_list = Post.objects.all()
-    posts_with_img = []
-    for post in post_list:
-        if post.image:
-            posts_with_img.append(post)
-        if len(posts_with_img) == 3:
-            break
+    post_list = post_feed()
+    posts_with_img = carousel.get_posts()
     additional_context = {'page_name': page_name,
-                          'posts_with_img': posts_with_img}
+                          'posts_with_img': posts_with_img,
+                          'feed_generation': feed_generation(INDEX_FEED),
+                          'thumbnail_resolver': ThumbnailResolver().add(
+                              posts_with_img, 'carousel')}
 
     return render_page_with_paginator(request, template,
                                       post_list, additional_context)
 
 
+@anonymous_etag(group_scopes)
+@anonymous_page_cache(group_scopes)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
     template = 'posts/group_list.html'
 
-    additional_context = {'group': group, }
-    post_list = group.groups.all()
+    additional_context = {'group': group,
+                          'feed_generation': feed_generation(
+                              group_feed(group.pk))}
+    post_list = post_feed(group.groups.all())
 
     return render_page_with_paginator(request, template,
                                       post_list, additional_context)
 
 
+@anonymous_etag(profile_scopes)
+@anonymous_page_cache(profile_scopes)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
     template = 'posts/profile.html'
 
-    post_list = author.posts.all()
+    post_list = post_feed(author.posts.all())
     following = request.user.follower.filter(
         author=author).exists() if request.user.is_authenticated else False
     additional_context = {'author': author,
-                          'following': following, }
+                          'following': following,
+                          'feed_generation': feed_generation(
+                              author_feed(author.pk))}
 
     return render_page_with_paginator(request, template,
                                       post_list, additional_context)
@@ -84,9 +125,24 @@ def follow_index(request):
     template = 'posts/follow.html'
     page_name = 'Публикации избранных авторов'
 
-    following = request.user.follower.values_list('author')
-    post_list = Post.objects.filter(author__pk__in=following)
-    additional_context = {'page_name': page_name, }
+    entries = timeline_feed(request.user.timeline.all())
+    page_obj = get_page_obj(request, entries, keyset=True)
+    page_obj.object_list = [entry.post for entry in page_obj.object_list]
+    context = {'page_obj': page_obj,
+               'page_name': page_name,
+               'thumbnail_resolver': ThumbnailResolver().add(page_obj,
+                                                             'card'), }
+    return render(request, template, context)
+
+
+def search_posts(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    page_name = f'Поиск: {query}' if query else 'Поиск'
+
+    post_list = post_feed(search.search(query))
+    additional_context = {'page_name': page_name,
+                          'query': query, }
 
     return render_page_with_paginator(request, template,
                                       post_list, additional_context)
@@ -100,7 +156,7 @@ def group_detail(request):
 def groups(request):
     template = 'posts/groups.html'
     page_name = 'Список групп'
-    groups_ = Group.objects.all()
+    groups_ = Group.objects.filter(posts_count__gt=0)
     context = {'page_name': page_name,
                'groups': groups_, }
     return render(request, template, context)
@@ -109,18 +165,45 @@ def groups(request):
 def authors(request):
     template = 'posts/authors.html'
     page_name = 'Список авторов'
-    authors_ = User.objects.all()
+    authors_ = (User.objects
+                .filter(stats__posts_count__gt=0)
+                .select_related('stats'))
     context = {'page_name': page_name,
                'authors': authors_, }
     return render(request, template, context)
 
 
+def get_comments_page(request: WSGIRequest, post_id: int) -> CursorPage:
+    """Возвращает страницу комментариев поста по курсору из запроса."""
+    comments = (Comment.objects
+                .filter(post_id=post_id)
+                .select_related('author')
+                .only('text', 'created', 'author', 'author__username'))
+    paginator = CursorPaginator(comments, COMMENTS_PER_PAGE,
+                                ordering=('-created', '-pk'))
+    return paginator.get_page(request.GET.get('cursor'))
+
+
+@anonymous_etag(post_scopes)
+@anonymous_page_cache(post_scopes)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__stats', 'group'), pk=post_id)
     template = 'posts/post_detail.html'
     form = CommentForm()
     context = {'post': post,
-               'form': form, }
+               'form': form,
+               'comments_page': get_comments_page(request, post.pk), }
+    return render(request, template, context)
+
+
+def comments(request, post_id):
+    template = 'posts/includes/comment_list.html'
+    comments_page = get_comments_page(request, post_id)
+    if not comments_page and not Post.objects.filter(pk=post_id).exists():
+        raise Http404
+    context = {'post_id': post_id,
+               'comments_page': comments_page, }
     return render(request, template, context)
 
 
@@ -0,0 +1,21 @@
+// Подгрузка следующих комментариев без перезагрузки страницы
+document.addEventListener('click', function (event) {
+  const link = event.target.closest('[data-comments-url]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  fetch(link.dataset.commentsUrl)
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      link.closest('.comments-more').outerHTML = html;
+    })
+    .catch(function () {
+      window.location.href = link.href;
+    });
+});
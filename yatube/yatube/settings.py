@@ -31,6 +31,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -49,7 +50,8 @@ LOGIN_REDIRECT_URL = 'posts:index'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': ('core.template_backends.instrumented.'
+                    'InstrumentedDjangoTemplates'),
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -111,12 +113,57 @@ STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Загрузки крупнее пишутся во временный файл частями, а не держатся в памяти
+FILE_UPLOAD_MAX_MEMORY_SIZE = 1024 * 1024
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': 'core.cache_backends.sqlite.SQLiteCache',
+        'LOCATION': os.getenv(
+            'CACHE_LOCATION',
+            default=os.path.join(BASE_DIR, 'cache.sqlite3'),
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+            'CULL_FREQUENCY': 4,
+        },
     }
 }
+
+THUMBNAIL_KVSTORE = 'posts.kvstore.BatchedKVStore'
+
+TEST_RUNNER = 'core.test_runner.CacheClearingTestRunner'
+
+# Доля запросов, которые core.middleware.RequestTimingMiddleware пишет в
+# лог core.requests; медленные запросы пишутся всегда
+REQUEST_LOG_SAMPLE_RATE = float(
+    os.getenv('REQUEST_LOG_SAMPLE_RATE', default=0.01))
+
+# Кеш страниц целиком для анонимных посетителей
+# (core.decorators.anonymous_page_cache)
+ANONYMOUS_PAGE_CACHE = True
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'message': {'format': '%(message)s'},
+    },
+    'handlers': {
+        'requests': {
+            'class': 'logging.StreamHandler',
+            'formatter': 'message',
+        },
+    },
+    'loggers': {
+        # Строки JSON от core.middleware.RequestTimingMiddleware
+        'core.requests': {
+            'handlers': ['requests'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}